@@ -1,7 +1,10 @@
 import requests
 from typing import Dict, List, Tuple, Optional
-from config.configManager import ConfigManager
+from config.configManager import resolve_config
+from api.httpTransport import HttpTransport, get_transport
+from api.searchCache import SearchCache
 from utils.jti import JTI
+from utils.rateLimiter import get_rate_limiter
 
 def generate_JWT_token(client_id, client_secret):
       
@@ -9,13 +12,17 @@ def generate_JWT_token(client_id, client_secret):
     return jwt_token
 
 class XOSearchAPI:
-    def __init__(self):
-        config = ConfigManager().get_config()
+    def __init__(self, transport: Optional[HttpTransport] = None, search_cache: Optional[SearchCache] = None,
+                 config=None):
+        config = resolve_config(config)
         self.client_id = config.get('UXO').get('client_id')
         self.client_secret = config.get('UXO').get('client_secret')
         self.auth_token = generate_JWT_token(self.client_id, self.client_secret)
         self.app_id = config.get('UXO').get('app_id')
         self.domain = config.get('UXO').get('domain')
+        self.transport = transport or get_transport(config.get('transport'))
+        self.search_cache = search_cache
+        self.rate_limiter = get_rate_limiter(f"search:{self.domain}", config.get('rate_limits', {}).get('search'))
         self.base_url = f'https://{self.domain}/api/public/bot/{self.app_id}'
 
     def _make_request(self, endpoint: str, data: Dict) -> Optional[Dict]:
@@ -25,7 +32,8 @@ class XOSearchAPI:
         }
         try:
 
-            response = requests.post(f"{self.base_url}/{endpoint}", json=data, headers=headers)
+            response = self.transport.post_json(f"{self.base_url}/{endpoint}", data, headers=headers,
+                                                rate_limiter=self.rate_limiter)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -37,8 +45,17 @@ class XOSearchAPI:
             "query": query,
             "includeChunksInResponse": True
         }
+        cache_key = None
+        if self.search_cache is not None and self.search_cache.mode != "off":
+            cache_key = self.search_cache.make_key(self.domain, self.app_id, query, data)
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
         print("Making SA search call for query:", query)
-        return self._make_request('advancedSearch', data)
+        response = self._make_request('advancedSearch', data)
+        if response is not None and cache_key is not None:
+            self.search_cache.set(cache_key, response)
+        return response
 
 
 class AnswerProcessor:
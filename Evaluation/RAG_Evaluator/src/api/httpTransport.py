@@ -0,0 +1,198 @@
+# src/api/httpTransport.py
+
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from utils.rateLimiter import AdaptiveRateLimiter, THROTTLE_STATUS_CODES, parse_retry_after
+
+DEFAULT_TRANSPORT_SETTINGS = {
+    "pool_size": 20,
+    "connect_timeout": 10,
+    "read_timeout": 120,
+    "gzip": False
+}
+
+# Timing record of the request currently being sent on this thread. The timed
+# connection classes below fill it in when the pool has to open a new socket.
+_current_timing = threading.local()
+
+
+def _record_timing(key: str, value: float):
+    timing = getattr(_current_timing, "value", None)
+    if timing is not None:
+        timing[key] = timing.get(key, 0.0) + value
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _record_timing("connect", time.perf_counter() - start)
+        return sock
+
+    def connect(self):
+        timing = getattr(_current_timing, "value", None)
+        connect_before = timing.get("connect", 0.0) if timing is not None else 0.0
+        start = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        if timing is not None:
+            # Whatever connect() spent beyond the TCP handshake went into TLS.
+            _record_timing("tls", max(elapsed - (timing.get("connect", 0.0) - connect_before), 0.0))
+            timing["new_connection"] = True
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+@dataclass
+class RequestTiming:
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    total: float = 0.0
+    new_connection: bool = False
+
+
+class TransportStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_time = 0.0
+        self.tls_time = 0.0
+        self.ttfb_time = 0.0
+        self.total_time = 0.0
+
+    def add(self, timing: RequestTiming):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += int(timing.new_connection)
+            self.connect_time += timing.connect
+            self.tls_time += timing.tls
+            self.ttfb_time += timing.ttfb
+            self.total_time += timing.total
+
+    def summary(self) -> Dict:
+        """Returns request counts and average per-request timings in milliseconds."""
+        with self._lock:
+            count = self.requests or 1
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.requests - self.new_connections,
+                "avg_connect_ms": round(1000 * self.connect_time / count, 2),
+                "avg_tls_ms": round(1000 * self.tls_time / count, 2),
+                "avg_ttfb_ms": round(1000 * self.ttfb_time / count, 2),
+                "avg_total_ms": round(1000 * self.total_time / count, 2),
+            }
+
+
+class HttpTransport:
+    """Keep-alive HTTP session with a connection pool shared by the search API clients."""
+
+    def __init__(self, pool_size=20, connect_timeout=10, read_timeout=120, gzip=False):
+        self.timeout = (connect_timeout, read_timeout)
+        self.gzip = gzip
+        self.stats = TransportStats()
+        self.session = requests.Session()
+        adapter = _TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+    def post_json(self, url: str, data: Dict, headers: Optional[Dict] = None,
+                  rate_limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 5) -> requests.Response:
+        """
+        Posts a JSON body. With a rate limiter, throttled (429/503) responses are
+        retried up to max_retries times and the last response is returned as is.
+        """
+        if rate_limiter is None:
+            return self._post_json(url, data, headers)
+        for attempt in range(max_retries + 1):
+            rate_limiter.acquire()
+            # Stays set if the request raises (connection error, timeout), so the limiter does not count it as a success
+            throttled, retry_after, failed = False, None, True
+            try:
+                response = self._post_json(url, data, headers)
+                failed = False
+                if response.status_code in THROTTLE_STATUS_CODES and attempt < max_retries:
+                    throttled = True
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    print(f"Request throttled with status {response.status_code}, retrying "
+                          f"(attempt {attempt + 1}/{max_retries})")
+                    continue
+                return response
+            finally:
+                rate_limiter.release(throttled=throttled, retry_after=retry_after, failed=failed)
+
+    def _post_json(self, url: str, data: Dict, headers: Optional[Dict] = None) -> requests.Response:
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        body = json.dumps(data).encode("utf-8")
+        if self.gzip:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        _current_timing.value = raw_timing = {}
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+        finally:
+            _current_timing.value = None
+        total = time.perf_counter() - start
+
+        connect = raw_timing.get("connect", 0.0)
+        tls = raw_timing.get("tls", 0.0)
+        # requests stops the elapsed clock once the response headers are parsed
+        ttfb = max(response.elapsed.total_seconds() - connect - tls, 0.0)
+        response.timing = RequestTiming(connect=connect, tls=tls, ttfb=ttfb, total=total,
+                                        new_connection=raw_timing.get("new_connection", False))
+        self.stats.add(response.timing)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(settings: Optional[Dict] = None) -> HttpTransport:
+    """Returns the process-wide transport for the given settings, creating it on first use."""
+    settings = {**DEFAULT_TRANSPORT_SETTINGS, **(settings or {})}
+    key = tuple(sorted(settings.items()))
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = HttpTransport(**settings)
+        return _transports[key]
@@ -0,0 +1,80 @@
+# src/api/searchCache.py
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from utils.diskCache import DiskCache
+
+SEARCH_CACHE_MODES = ("readwrite", "refresh", "readonly", "off")
+
+DEFAULT_SEARCH_CACHE_SETTINGS = {
+    "path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "cache", "search_cache.sqlite"),
+    "ttl_hours": 168,
+    "max_entries": 200000
+}
+
+
+class SearchCache:
+    """
+    Persistent cache of advancedSearch responses keyed by domain, app id, query
+    and request body.
+
+    Modes: "readwrite" serves hits and stores misses, "refresh" always calls the
+    API and overwrites stored responses, "readonly" serves hits without storing
+    anything and "off" bypasses the cache.
+    """
+
+    def __init__(self, mode="readwrite", path=None, ttl_hours=None, max_entries=None):
+        if mode not in SEARCH_CACHE_MODES:
+            raise ValueError(f"Unknown search cache mode '{mode}', expected one of {SEARCH_CACHE_MODES}")
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._store = None
+        if mode != "off":
+            self._store = DiskCache(path or DEFAULT_SEARCH_CACHE_SETTINGS["path"],
+                                    ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+                                    max_entries=max_entries,
+                                    readonly=mode == "readonly")
+
+    @staticmethod
+    def make_key(domain: str, app_id: str, query: str, body: Dict) -> str:
+        payload = json.dumps([domain, app_id, query, body], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        if self.mode not in ("readwrite", "readonly"):
+            return None
+        value = self._store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, response: Dict):
+        if self.mode not in ("readwrite", "refresh"):
+            return
+        self._store.set(key, json.dumps(response).encode("utf-8"))
+
+    def summary(self) -> Dict:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(mode: str = "off", settings: Optional[Dict] = None) -> SearchCache:
+    """Returns the search cache shared by every client in this process for the given mode and settings."""
+    settings = {**DEFAULT_SEARCH_CACHE_SETTINGS, **(settings or {})}
+    key = (mode, tuple(sorted(settings.items())))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SearchCache(mode, **settings)
+        return _caches[key]
@@ -0,0 +1,77 @@
+# src/benchmarks/importTime.py
+#
+# Measures how long importing the CLI and the evaluator modules takes, using python -X importtime,
+# and checks that heavy backends are only imported by the evaluators that need them.
+# Run from the src directory: python -m benchmarks.importTime --runs 5
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+# Modules to import and the packages each one must not pull in
+TARGETS = {
+    "main": ("openai", "ragas", "langchain_core", "langchain_openai", "datasets", "transformers", "pymongo"),
+    "evaluators.cragEvaluator": ("ragas", "langchain_core", "langchain_openai", "datasets", "transformers", "pymongo"),
+}
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_times(module):
+    """
+    Imports module in a fresh interpreter; returns {name: (depth, self_us, cumulative_us)} of the imports
+    it caused, module itself at depth 0. Modules the interpreter loaded at startup are left out.
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SRC_DIR,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+    lines = [match.groups() for match in map(IMPORT_TIME_LINE.match, process.stderr.splitlines()) if match]
+    # -X importtime lists a module after everything it imported, so module's imports are the lines
+    # between the previous top-level import and module itself
+    end = max(index for index, (_, _, indent, name) in enumerate(lines) if name == module and not indent)
+    start = end
+    while start > 0 and lines[start - 1][2]:
+        start -= 1
+    return {name: (len(indent) // 2, int(self_us), int(cumulative_us))
+            for self_us, cumulative_us, indent, name in lines[start:end + 1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the import time of the CLI and the evaluators.')
+    parser.add_argument('--module', type=str, nargs='+', choices=list(TARGETS), default=list(TARGETS),
+                        help='Modules to import.')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module; the median is reported.')
+    parser.add_argument('--top', type=int, default=8, help='Slowest direct imports listed per module.')
+    parser.add_argument('--max_ms', type=float, help='Fail if a module takes longer than this to import.')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.module:
+        runs = [import_times(module) for _ in range(max(args.runs, 1))]
+        totals = [timings[module][2] for timings in runs]
+        median = statistics.median(totals)
+        timings = runs[totals.index(min(totals, key=lambda total: abs(total - median)))]
+        print(f"{module}: {median / 1000:.1f} ms (min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f}, {len(runs)} runs)")
+
+        direct = sorted(((cumulative, name) for name, (depth, _, cumulative) in timings.items() if depth == 1), reverse=True)
+        for cumulative, name in direct[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+        loaded = sorted({name.split(".")[0] for name in timings} & set(TARGETS[module]))
+        if loaded:
+            print(f"    imports heavy backends it should load lazily: {', '.join(loaded)}")
+            failed = True
+        if args.max_ms is not None and median / 1000 > args.max_ms:
+            print(f"    slower than --max_ms {args.max_ms}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# src/benchmarks/trimBenchmark.py
+#
+# Compares the per-row prediction trimming with the batched, offset-mapping based trim.
+# Run from the src directory: python -m benchmarks.trimBenchmark --rows 5000
+
+import argparse
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from utils.dataProcessing import get_tokenizer, trim_predictions_to_max_token_length, trim_predictions_batch
+
+WORDS = ("the", "search", "assistant", "returned", "an", "answer", "about", "billing", "policy", "refunds",
+         "within", "thirty", "days", "of", "purchase", "account", "settings", "page", "contact", "support")
+
+
+def make_predictions(rows, min_words=5, max_words=200, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) for _ in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row vs batched prediction trimming.')
+    parser.add_argument('--rows', type=int, default=5000, help='Number of synthetic predictions.')
+    parser.add_argument('--max_token_length', type=int, default=75, help='Tokens kept per prediction.')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tokenizer = get_tokenizer()
+    print(f"Tokenizer load: {time.perf_counter() - start:.3f}s")
+    predictions = make_predictions(args.rows)
+
+    start = time.perf_counter()
+    for prediction in predictions:
+        trim_predictions_to_max_token_length(prediction, tokenizer, args.max_token_length)
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trim_predictions_batch(predictions, tokenizer, args.max_token_length)
+    batched = time.perf_counter() - start
+
+    print(f"Per-row trim: {per_row:.3f}s ({args.rows / per_row:.0f} rows/s)")
+    print(f"Batched trim: {batched:.3f}s ({args.rows / batched:.0f} rows/s)")
+    print(f"Speed-up: {per_row / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,58 @@
 # src/config/configManager.py
 
+import hashlib
 import json
 from pathlib import Path
+from types import MappingProxyType
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / 'config.json'
+
+
+def freeze_config(value):
+    """Read-only copy of a parsed config: dicts become mapping proxies and lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_config(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+
+def thaw_config(value):
+    """Plain dict/list copy of a frozen config, e.g. to serialize it."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_config(item) for item in value]
+    return value
+
+
+def config_fingerprint(config):
+    """Stable hash of a config's contents; equal configs share evaluators built for them."""
+    return hashlib.sha256(json.dumps(thaw_config(config), sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """
+    Reads a config file into an immutable config. Each evaluation carries its own, so runs against
+    different apps or models can share a process without touching config/config.json.
+    """
+    with open(path, 'r') as f:
+        return freeze_config(json.load(f))
+
 
 class ConfigManager:
+    """Process-wide default config, read once from config/config.json; used when no config is passed in."""
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ConfigManager, cls).__new__(cls)
-            cls._instance.config = cls._instance._load_config()
+            cls._instance.config = load_config()
         return cls._instance
 
-    def _load_config(self):
-        config_path = Path(__file__).parent / 'config.json'
-        with open(config_path, 'r') as f:
-            return json.load(f)
-
     def get_config(self):
-        return self.config
\ No newline at end of file
+        return self.config
+
+
+def resolve_config(config=None):
+    return config if config is not None else ConfigManager().get_config()
@@ -1,12 +1,21 @@
 # src/evaluators/baseEvaluator.py
 
+import copy
 from abc import ABC, abstractmethod
 
 class BaseEvaluator(ABC):
+    progress = None
+
     @abstractmethod
     def evaluate(self, queries, answers, ground_truths, contexts):
         pass
 
     @abstractmethod
     def process_results(self, results):
-        pass
\ No newline at end of file
+        pass
+
+    def with_progress(self, progress):
+        """Copy that reports to progress (a ProgressTracker) and shares everything this evaluator has built."""
+        evaluator = copy.copy(self)
+        evaluator.progress = progress
+        return evaluator
@@ -0,0 +1,113 @@
+# src/evaluators/cragBatchJob.py
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict
+
+from loguru import logger
+
+BATCH_WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "batches")
+
+DEFAULT_BATCH_API_SETTINGS = {
+    "poll_interval_seconds": 60,
+    "timeout_hours": 24,
+    "completion_window": "24h"
+}
+
+FINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class CragBatchJob:
+    """
+    Runs CRAG judge requests through the OpenAI Batch API: writes the requests
+    to a JSONL file, uploads and submits it, polls until the batch finishes and
+    returns the judge replies keyed by custom_id.
+
+    The submitted batch id is kept next to the JSONL file, named after a hash of
+    its content, so re-running the same requests (e.g. with --resume) picks up
+    the batch that is already in flight instead of paying for it twice.
+    """
+
+    def __init__(self, openai_client, work_dir=BATCH_WORK_DIR, poll_interval_seconds=60, timeout_hours=24,
+                 completion_window="24h"):
+        self.openai_client = openai_client
+        self.work_dir = work_dir
+        self.poll_interval_seconds = poll_interval_seconds
+        self.timeout_hours = timeout_hours
+        self.completion_window = completion_window
+        os.makedirs(work_dir, exist_ok=True)
+
+    def write_requests(self, requests_by_id: Dict[str, Dict]) -> str:
+        """Writes one chat completion request per custom_id and returns the JSONL file path."""
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body},
+                       ensure_ascii=False)
+            for custom_id, body in requests_by_id.items()
+        ]
+        content = "\n".join(lines) + "\n"
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(self.work_dir, f"crag_batch_{digest}.jsonl")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return path
+
+    def submit(self, requests_path: str) -> str:
+        state_path = requests_path + ".batch_id"
+        if os.path.exists(state_path):
+            with open(state_path, "r") as f:
+                batch_id = f.read().strip()
+            batch = self.openai_client.batches.retrieve(batch_id)
+            if batch.status not in ("failed", "expired", "cancelled"):
+                logger.info(f"Reusing batch {batch_id} ({batch.status}) for {os.path.basename(requests_path)}")
+                return batch_id
+
+        with open(requests_path, "rb") as f:
+            input_file = self.openai_client.files.create(file=f, purpose="batch")
+        batch = self.openai_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        with open(state_path, "w") as f:
+            f.write(batch.id)
+        logger.info(f"Submitted batch {batch.id} with requests from {os.path.basename(requests_path)}")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        deadline = time.time() + self.timeout_hours * 3600
+        while True:
+            batch = self.openai_client.batches.retrieve(batch_id)
+            if batch.status in FINAL_BATCH_STATUSES:
+                return batch
+            if time.time() > deadline:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {self.timeout_hours} hours")
+            counts = batch.request_counts
+            logger.info(f"Batch {batch_id} is {batch.status}"
+                        + (f" ({counts.completed}/{counts.total} done)" if counts else ""))
+            time.sleep(self.poll_interval_seconds)
+
+    def download_results(self, batch) -> Dict[str, str]:
+        """Returns the reply content of every successful request, keyed by custom_id."""
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"Batch {batch.id} ended with status '{batch.status}' and no output file")
+            return {}
+        results = {}
+        for line in self.openai_client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                logger.warning(f"Batch request {entry.get('custom_id')} failed: {entry.get('error') or response}")
+                continue
+            results[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        return results
+
+    def run(self, requests_by_id: Dict[str, Dict]) -> Dict[str, str]:
+        if not requests_by_id:
+            return {}
+        batch = self.wait(self.submit(self.write_requests(requests_by_id)))
+        return self.download_results(batch)
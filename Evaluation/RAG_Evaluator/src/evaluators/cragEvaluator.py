@@ -1,118 +1,456 @@
 import os
 import json
+import asyncio
 import pandas as pd
-from tqdm.auto import tqdm
 import sys
+import time
+from functools import lru_cache
 
 sys.path.append(str(os.getcwd()))
-from transformers import AutoTokenizer
+from openai import APIConnectionError, AsyncOpenAI
 from loguru import logger
 from evaluators.baseEvaluator import BaseEvaluator
 from utils.fileHandling import log_response
-from utils.dataProcessing import trim_predictions_to_max_token_length
-from config.configManager import ConfigManager
+from utils.dataProcessing import get_tokenizer, trim_predictions_batch
+from utils.progressTracker import TrackedProgressBar
+from config.configManager import resolve_config
 from utils.fileHandling import load_json_file
+from utils.rateLimiter import get_rate_limiter, parse_retry_after, THROTTLE_STATUS_CODES
+from utils.asyncUtils import run_coroutine_sync
+from evaluators.verdictCache import VerdictCache, get_verdict_cache
+from evaluators.cragBatchJob import CragBatchJob, DEFAULT_BATCH_API_SETTINGS
 
 # Give relative path of the file from src directory
 prompts_file_path = "./prompts/prompts.json"
-prompts = load_json_file(prompts_file_path)
+
+
+@lru_cache(maxsize=None)
+def get_prompts():
+    """The judge prompts, read on first use rather than when the module is imported."""
+    return load_json_file(prompts_file_path)
 
 
 class CragEvaluator(BaseEvaluator):
-    def __init__(self, model_name, openai_client):
+    def __init__(self, model_name, openai_client, async_openai_client=None, config=None, progress=None):
         self.model_name = model_name
         self.openai_client = openai_client
-        self.tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-        self.config = ConfigManager().get_config()
+        self.async_openai_client = async_openai_client
+        self.config = resolve_config(config)
+        # Optional ProgressTracker; the progress bars and the token counts of the judge calls feed it
+        self.progress = progress
+        self.rate_limiter = get_rate_limiter("openai", self.config.get('rate_limits', {}).get('openai'))
+        self.verdict_cache = get_verdict_cache(self.config.get('verdict_cache'))
 
-    def evaluate(self, queries, answers, ground_truths, contexts):
-        metrics_data = []
+    @property
+    def tokenizer(self):
+        # Shared by every evaluator in the process and only loaded once a row needs trimming
+        return get_tokenizer("bert-base-uncased")
 
-        for query, ground_truth, prediction in tqdm(
-                zip(queries, ground_truths, answers), total=len(queries), desc="Evaluating Predictions"
-        ):
-            n_miss, n_correct, n_correct_exact = 0, 0, 0
-            result_entry = {
-                "query": query,
-                "ground_truth": ground_truth,
-                "prediction": prediction,
-            }
-
-            ground_truth = ground_truth.strip()
-            prediction = trim_predictions_to_max_token_length(prediction, self.tokenizer)
-
-            ground_truth_lowercase = ground_truth.lower()
-            prediction_lowercase = prediction.lower()
-
-            messages = [
-                {"role": "system", "content": self.get_system_message()},
-                {
-                    "role": "user",
-                    "content": f"Question: {query}\\n Ground truth: {ground_truth}\\n Prediction: {prediction}\\n",
-                },
-            ]
-
-            if any(term in prediction_lowercase for term in
-                   ["i don't know", "no answer found", "not enough information", "Failed to get response"]):
-                n_miss += 1
-                result_entry.update({"score": -1, "missing": True})
-            elif prediction_lowercase == ground_truth_lowercase:
-                n_correct_exact += 1
-                n_correct += 1
-                result_entry.update({"score": 1, "exact_accuracy": 1})
-            else:
-                response = self.attempt_api_call(messages)
-                if response:
-                    # uncomment whenever needed
-                    # log_response(messages, response)
-                    eval_res = self.parse_crag_response(response)
-                    if eval_res == 1:
-                        n_correct += 1
-                        result_entry["score"] = 1  # Positive evaluation
-                    else:
-                        result_entry["score"] = 0  # Neutral evaluation
-
-            # Updating the metric results into the result_entry
-            n = 1  # TODO: need to understand it's usecase
-            result_entry.update({
-                "score": (2 * n_correct + n_miss) / n - 1,
-                "exact_accuracy": n_correct_exact / n,
-                "accuracy": n_correct / n,
-                "hallucination": (n - n_correct - n_miss) / n,
-                "missing": n_miss / n,
-                "n_miss": n_miss,
-                "n_correct": n_correct,
-                "n_correct_exact": n_correct_exact,
-                "total": n
-            })
+    def evaluate(self, queries, answers, ground_truths, contexts, on_result=None, max_concurrency=1, batch_size=1,
+                 use_batch_api=False):
+        """
+        Judges every row. With max_concurrency > 1 the async judge is used; with batch_size > 1 up to
+        batch_size rows that need the judge are packed into a single request. use_batch_api sends the
+        requests through the OpenAI Batch API instead.
+        """
+        if use_batch_api:
+            return self.evaluate_offline(queries, answers, ground_truths, contexts, on_result=on_result,
+                                         batch_size=batch_size)
+        if max_concurrency and max_concurrency > 1:
+            return run_coroutine_sync(self.evaluate_async(queries, answers, ground_truths, contexts, on_result=on_result,
+                                                          max_concurrency=max_concurrency, batch_size=batch_size))
+        metrics_data = []
+        prepared_rows = self.prepare_rows(queries, ground_truths, answers)
+        batch_size = max(batch_size or 1, 1)
 
-            metrics_data.append(result_entry)
+        with self.progress_bar(len(prepared_rows)) as progress_bar:
+            for start in range(0, len(prepared_rows), batch_size):
+                prepared = prepared_rows[start:start + batch_size]
+                results = self.judge_prepared(prepared, batched=batch_size > 1)
+                for offset, result_entry in enumerate(results):
+                    metrics_data.append(result_entry)
+                    if on_result:
+                        on_result(start + offset, result_entry)
+                progress_bar.update_rows(results)
 
         # Convert the metrics data to a DataFrame
         results_df = pd.DataFrame(metrics_data)
         return results_df
 
+    async def evaluate_async(self, queries, answers, ground_truths, contexts, on_result=None, max_concurrency=8,
+                             batch_size=1):
+        """Judges rows concurrently with at most max_concurrency calls in flight; results keep the input order."""
+        # An async client is bound to the event loop it first ran on, so one is made per call unless injected
+        client = self.async_openai_client or AsyncOpenAI(api_key=self.openai_client.api_key,
+                                                         base_url=self.openai_client.base_url)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        prepared_rows = self.prepare_rows(queries, ground_truths, answers)
+        batch_size = max(batch_size or 1, 1)
+        progress_bar = self.progress_bar(len(prepared_rows))
+
+        async def judge_rows(start):
+            prepared = prepared_rows[start:start + batch_size]
+            items = [item for _, _, item in prepared if item is not None]
+            verdicts = []
+            if items:
+                async with semaphore:
+                    if batch_size > 1:
+                        verdicts = await self.judge_batch_async(client, items)
+                    else:
+                        verdicts = [await self.judge_async(client, items[0])]
+            verdicts = iter(verdicts)
+            results = []
+            for offset, (result_entry, outcome, item) in enumerate(prepared):
+                verdict = next(verdicts) if item is not None else None
+                result_entry = self.score_row(result_entry, outcome, verdict)
+                results.append(result_entry)
+                if on_result:
+                    on_result(start + offset, result_entry)
+            progress_bar.update_rows(results)
+            return results
+
+        try:
+            batches = await asyncio.gather(*(judge_rows(start) for start in range(0, len(prepared_rows), batch_size)))
+        finally:
+            progress_bar.close()
+            if client is not self.async_openai_client:
+                await client.close()
+        return pd.DataFrame([result_entry for batch in batches for result_entry in batch])
+
+    def evaluate_offline(self, queries, answers, ground_truths, contexts, on_result=None, batch_size=1, batch_job=None):
+        """
+        Judges rows through the OpenAI Batch API and merges the replies back by custom_id. Requests that
+        fail inside the batch, or whose reply cannot be parsed, are retried as regular calls.
+        """
+        if batch_job is None:
+            batch_job = CragBatchJob(self.openai_client,
+                                     **{**DEFAULT_BATCH_API_SETTINGS, **self.config.get('batch_api', {})})
+        prepared = self.prepare_rows(queries, ground_truths, answers)
+
+        batch_size = max(batch_size or 1, 1)
+        verdicts, pending = {}, []
+        for index, (_, _, item) in enumerate(prepared):
+            if item is None:
+                continue
+            verdicts[index] = self.lookup_verdict(item, batched=batch_size > 1)
+            if verdicts[index] is None:
+                pending.append(index)
+
+        groups = {}
+        for start in range(0, len(pending), batch_size):
+            group = pending[start:start + batch_size]
+            items = [prepared[index][2] for index in group]
+            messages = self.build_messages(items[0]) if len(items) == 1 else self.build_batch_messages(items)
+            groups[f"rows-{group[0]}-{group[-1]}"] = (group, {
+                "model": self.model_name,
+                "messages": messages,
+                "response_format": {"type": "json_object"},
+            })
+        logger.info(f"Submitting {len(pending)} CRAG judgements as {len(groups)} batch requests")
+        responses = batch_job.run({custom_id: body for custom_id, (_, body) in groups.items()})
+
+        for custom_id, (group, _) in groups.items():
+            response = responses.get(custom_id)
+            batched = len(group) > 1
+            if batched:
+                group_verdicts = self.parse_batch_response(response, len(group))
+            else:
+                group_verdicts = [self.parse_single_response(response)] if response else None
+            if group_verdicts is None:
+                group_verdicts = [self.parse_single_response(self.attempt_api_call(self.build_messages(prepared[index][2])))
+                                  for index in group]
+                batched = False
+            for index, verdict in zip(group, group_verdicts):
+                verdicts[index] = self.store_verdict(prepared[index][2], verdict, batched=batched)
+
+        metrics_data = []
+        with self.progress_bar(len(prepared)) as progress_bar:
+            for index, (result_entry, outcome, item) in enumerate(prepared):
+                result_entry = self.score_row(result_entry, outcome, verdicts.get(index))
+                metrics_data.append(result_entry)
+                if on_result:
+                    on_result(index, result_entry)
+            progress_bar.update_rows(metrics_data)
+        return pd.DataFrame(metrics_data)
+
+    def progress_bar(self, total):
+        return TrackedProgressBar(total=total, desc="Evaluating Predictions", tracker=self.progress, stage="crag")
+
+    def record_usage(self, response):
+        usage = getattr(response, "usage", None)
+        if self.progress is not None and usage is not None:
+            self.progress.add_tokens("crag", usage.prompt_tokens, usage.completion_tokens)
+
+    def judge_prepared(self, prepared, batched=False):
+        """
+        Judges prepared rows and scores them. With batched, the rows are sent in a single request
+        (a lone row that needs the judge is sent with the single-row prompt); otherwise one per row.
+        """
+        items = [item for _, _, item in prepared if item is not None]
+        verdicts = iter(self.judge_batch(items) if batched else [self.judge(item) for item in items])
+        return [self.score_row(result_entry, outcome, next(verdicts) if item is not None else None)
+                for result_entry, outcome, item in prepared]
+
+    def prepare_rows(self, queries, ground_truths, answers):
+        # Trimming the whole prediction column in one tokenizer call is much faster than per row
+        trimmed_answers = trim_predictions_batch(answers, self.tokenizer)
+        return [self.prepare_row(query, ground_truth, prediction, trimmed_prediction)
+                for query, ground_truth, prediction, trimmed_prediction
+                in zip(queries, ground_truths, answers, trimmed_answers)]
+
+    def prepare_row(self, query, ground_truth, prediction, trimmed_prediction=None):
+        """
+        Returns (result_entry, outcome, item) for one row. outcome is "missing" or "exact" when the
+        row can be scored without the judge; otherwise item holds the texts to send to the judge.
+        """
+        result_entry = {
+            "query": query,
+            "ground_truth": ground_truth,
+            "prediction": prediction,
+        }
+
+        ground_truth = ground_truth.strip()
+        if trimmed_prediction is None:
+            trimmed_prediction = trim_predictions_batch([prediction], self.tokenizer)[0]
+        prediction = trimmed_prediction
+
+        ground_truth_lowercase = ground_truth.lower()
+        prediction_lowercase = prediction.lower()
+
+        if any(term in prediction_lowercase for term in
+               ["i don't know", "no answer found", "not enough information", "Failed to get response"]):
+            return result_entry, "missing", None
+        if prediction_lowercase == ground_truth_lowercase:
+            return result_entry, "exact", None
+        return result_entry, None, {"question": query, "ground_truth": ground_truth, "prediction": prediction}
+
+    def build_messages(self, item):
+        return [
+            {"role": "system", "content": self.get_system_message()},
+            {
+                "role": "user",
+                "content": f"Question: {item['question']}\\n Ground truth: {item['ground_truth']}\\n Prediction: {item['prediction']}\\n",
+            },
+        ]
+
+    def build_batch_messages(self, items):
+        payload = {"items": [{"id": index, **item} for index, item in enumerate(items)]}
+        return [
+            {"role": "system", "content": self.get_batch_system_message()},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+        ]
+
+    def verdict_key(self, item, batched=False):
+        """Cache key of a judge item under the prompt it is judged with, so batch and single-row verdicts are kept apart."""
+        system_message = self.get_batch_system_message() if batched else self.get_system_message()
+        return VerdictCache.make_key(system_message, self.model_name,
+                                     item["question"], item["ground_truth"], item["prediction"])
+
+    def lookup_verdict(self, item, batched=False):
+        """
+        Returns the cached verdict of a judge item, or None. When rows are batched, the single-row
+        verdict is tried after the batch one, since a lone pending row is sent with the single-row prompt.
+        """
+        if self.verdict_cache is None:
+            return None
+        if batched:
+            return self.verdict_cache.get(self.verdict_key(item, True), self.verdict_key(item))
+        return self.verdict_cache.get(self.verdict_key(item))
+
+    def store_verdict(self, item, verdict, batched=False):
+        # Replies that could not be parsed (None) are not cached, so the row is judged again next run
+        if verdict is not None and self.verdict_cache is not None:
+            self.verdict_cache.set(self.verdict_key(item, batched), verdict)
+        return verdict
+
+    def parse_single_response(self, response):
+        # uncomment whenever needed
+        # log_response(messages, response)
+        return self.parse_crag_response(response) if response else None
+
+    def judge(self, item):
+        """Returns the parsed verdict for one row, from the verdict cache when possible."""
+        verdict = self.lookup_verdict(item)
+        if verdict is not None:
+            return verdict
+        response = self.attempt_api_call(self.build_messages(item))
+        return self.store_verdict(item, self.parse_single_response(response))
+
+    async def judge_async(self, client, item):
+        verdict = self.lookup_verdict(item)
+        if verdict is not None:
+            return verdict
+        response = await self.attempt_api_call_async(client, self.build_messages(item))
+        return self.store_verdict(item, self.parse_single_response(response))
+
+    def judge_batch(self, items):
+        """Judges several rows with one request, falling back to per-item calls if the reply is malformed."""
+        verdicts = [self.lookup_verdict(item, batched=True) for item in items]
+        pending = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        if len(pending) > 1:
+            response = self.attempt_api_call(self.build_batch_messages([items[index] for index in pending]))
+            batch_verdicts = self.parse_batch_response(response, len(pending))
+            if batch_verdicts is not None:
+                for index, verdict in zip(pending, batch_verdicts):
+                    verdicts[index] = self.store_verdict(items[index], verdict, batched=True)
+                pending = []
+        for index in pending:
+            response = self.attempt_api_call(self.build_messages(items[index]))
+            verdicts[index] = self.store_verdict(items[index], self.parse_single_response(response))
+        return verdicts
+
+    async def judge_batch_async(self, client, items):
+        verdicts = [self.lookup_verdict(item, batched=True) for item in items]
+        pending = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        if len(pending) > 1:
+            response = await self.attempt_api_call_async(
+                client, self.build_batch_messages([items[index] for index in pending]))
+            batch_verdicts = self.parse_batch_response(response, len(pending))
+            if batch_verdicts is not None:
+                for index, verdict in zip(pending, batch_verdicts):
+                    verdicts[index] = self.store_verdict(items[index], verdict, batched=True)
+                pending = []
+        for index in pending:
+            response = await self.attempt_api_call_async(client, self.build_messages(items[index]))
+            verdicts[index] = self.store_verdict(items[index], self.parse_single_response(response))
+        return verdicts
+
+    def parse_batch_response(self, resp, count):
+        """Returns one verdict per batch item in item order, or None if the reply cannot be demultiplexed."""
+        if not resp:
+            return None
+        try:
+            model_resp = json.loads(resp.lower())
+            verdicts_by_id = {int(verdict["id"]): verdict for verdict in model_resp["verdicts"]}
+            if sorted(verdicts_by_id) != list(range(count)):
+                raise ValueError(f"Expected verdicts for ids 0..{count - 1}, got {sorted(verdicts_by_id)}")
+            verdicts = []
+            for index in range(count):
+                accuracy_value = verdicts_by_id[index].get("accuracy")
+                if accuracy_value in (True, "true"):
+                    verdicts.append(1)
+                elif accuracy_value in (False, "false"):
+                    verdicts.append(-1)
+                else:
+                    raise ValueError(f"Unexpected accuracy value: {accuracy_value}")
+            return verdicts
+        except Exception as e:
+            logger.warning(f"Malformed batch response, falling back to per-item calls. Error: {e}")
+            logger.debug(f"Response content: {resp}")
+            return None
+
+    def score_row(self, result_entry, outcome, verdict):
+        n_miss, n_correct, n_correct_exact = 0, 0, 0
+        if outcome == "missing":
+            n_miss += 1
+        elif outcome == "exact":
+            n_correct_exact += 1
+            n_correct += 1
+        elif verdict == 1:
+            n_correct += 1
+
+        # Updating the metric results into the result_entry
+        n = 1  # TODO: need to understand it's usecase
+        result_entry.update({
+            "score": (2 * n_correct + n_miss) / n - 1,
+            "exact_accuracy": n_correct_exact / n,
+            "accuracy": n_correct / n,
+            "hallucination": (n - n_correct - n_miss) / n,
+            "missing": n_miss / n,
+            "n_miss": n_miss,
+            "n_correct": n_correct,
+            "n_correct_exact": n_correct_exact,
+            "total": n
+        })
+        return result_entry
+
     def process_results(self, results):
         return results  # Return the DataFrame directly
 
     def get_system_message(self):
         # Load system message from config or file
-        return prompts.get("cragEvaluationPrompt", "")
+        return get_prompts().get("cragEvaluationPrompt", "")
+
+    def get_batch_system_message(self):
+        return self.get_system_message() + "\\r\\n" + get_prompts().get("cragBatchEvaluationPrompt", "")
 
     def attempt_api_call(self, messages, max_retries=10):
         for attempt in range(max_retries):
+            self.rate_limiter.acquire()
+            throttled, retry_after, failed = False, None, False
             try:
                 response = self.openai_client.chat.completions.create(
                     model=self.model_name,
                     messages=messages,
                     response_format={"type": "json_object"},
                 )
+                self.record_usage(response)
                 return response.choices[0].message.content
             except Exception as e:
-                logger.warning(f"API call failed on attempt {attempt + 1}, retrying... Error: {e}")
+                failed = True
+                throttled, retry_after = self.get_throttle_info(e)
+                if not self.should_retry(e, attempt, max_retries):
+                    return None
+            finally:
+                self.rate_limiter.release(throttled=throttled, retry_after=retry_after, failed=failed)
+            if not throttled:
+                # Throttled calls are paused by the shared limiter; other transient failures back off here.
+                time.sleep(self.rate_limiter.backoff_delay(attempt))
         return None
 
+    async def attempt_api_call_async(self, client, messages, max_retries=10):
+        for attempt in range(max_retries):
+            await self.rate_limiter.acquire_async()
+            throttled, retry_after, failed = False, None, False
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                )
+                self.record_usage(response)
+                return response.choices[0].message.content
+            except Exception as e:
+                failed = True
+                throttled, retry_after = self.get_throttle_info(e)
+                if not self.should_retry(e, attempt, max_retries):
+                    return None
+            finally:
+                self.rate_limiter.release(throttled=throttled, retry_after=retry_after, failed=failed)
+            if not throttled:
+                await asyncio.sleep(self.rate_limiter.backoff_delay(attempt))
+        return None
+
+    @staticmethod
+    def is_transient_error(error):
+        """Throttles, timeouts, connection errors and 5xx are worth retrying; other 4xx (bad request, auth, unknown model) are not."""
+        status_code = getattr(error, 'status_code', None)
+        if status_code is None:
+            return isinstance(error, APIConnectionError)
+        return status_code in THROTTLE_STATUS_CODES or status_code >= 500
+
+    def should_retry(self, error, attempt, max_retries):
+        """Logs a failed call and returns whether to try it again."""
+        if not self.is_transient_error(error):
+            logger.error(f"API call failed with a permanent error, not retrying. Error: {error}")
+            return False
+        if attempt + 1 >= max_retries:
+            logger.error(f"API call failed after {max_retries} attempts. Error: {error}")
+            return False
+        logger.warning(f"API call failed on attempt {attempt + 1}, retrying... Error: {error}")
+        return True
+
+    @staticmethod
+    def get_throttle_info(error):
+        """Returns (throttled, retry_after) for an exception raised by the OpenAI client."""
+        if getattr(error, 'status_code', None) not in THROTTLE_STATUS_CODES:
+            return False, None
+        response = getattr(error, 'response', None)
+        headers = response.headers if response is not None else {}
+        return True, parse_retry_after(headers.get('retry-after'))
+
     def parse_crag_response(self, resp: str):
+        """Returns 1 or -1 for the judge's accuracy verdict, or None if the reply cannot be parsed."""
         try:
             resp = resp.lower()
             model_resp = json.loads(resp)
@@ -132,4 +470,4 @@ class CragEvaluator(BaseEvaluator):
         except Exception as e:
             logger.error(f"Error parsing response: {e}")
             logger.debug(f"Response content: {resp}")
-            return -1
+            return None
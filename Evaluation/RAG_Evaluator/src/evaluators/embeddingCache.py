@@ -0,0 +1,108 @@
+# src/evaluators/embeddingCache.py
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.diskCache import DiskCache
+
+DEFAULT_EMBEDDING_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "cache", "embeddings.sqlite"),
+    "max_entries": 1000000
+}
+
+
+class EmbeddingCache:
+    """
+    Persistent store of embedding vectors keyed by the embedding model and a hash
+    of the exact text. Vectors are kept as float32 bytes; least recently used
+    vectors are evicted past max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self._store = DiskCache(path or DEFAULT_EMBEDDING_CACHE_SETTINGS["path"], max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\x1e{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = self._store.get_many(keys)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return {key: np.frombuffer(value, dtype=np.float32).tolist() for key, value in found.items()}
+
+    def set_many(self, vectors: Dict[str, List[float]]):
+        self._store.set_many({key: np.asarray(vector, dtype=np.float32).tobytes() for key, vector in vectors.items()})
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Langchain embeddings wrapper that serves repeated texts from an EmbeddingCache.
+    Every call looks all of its texts up at once and sends the distinct misses to
+    the wrapped model in a single request. Vectors are rounded to float32 on a
+    miss too, so scores do not depend on whether a vector came from the cache.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def _lookup(self, texts: List[str]):
+        keys = [self.cache.make_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in found))
+        return keys, found, missing
+
+    def _store(self, keys, found, missing, vectors):
+        computed = {self.cache.make_key(self.model_name, text): np.asarray(vector, dtype=np.float32).tolist()
+                    for text, vector in zip(missing, vectors)}
+        self.cache.set_many(computed)
+        found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        return self._store(keys, found, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        vectors = await self.embeddings.aembed_documents(missing) if missing else []
+        return self._store(keys, found, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(settings: Optional[Dict] = None) -> Optional[EmbeddingCache]:
+    """Returns the process-wide embedding cache, or None when it is disabled in the config."""
+    settings = {**DEFAULT_EMBEDDING_CACHE_SETTINGS, **(settings or {})}
+    if not settings.pop("enabled"):
+        return None
+    key = tuple(sorted(settings.items()))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(**settings)
+        return _caches[key]
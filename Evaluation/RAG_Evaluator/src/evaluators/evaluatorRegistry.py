@@ -0,0 +1,110 @@
+# src/evaluators/evaluatorRegistry.py
+
+import importlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from config.configManager import config_fingerprint, resolve_config
+
+# Evaluator backends by name, as (module, class). A backend's module, and with it openai or
+# ragas/langchain/datasets, is only imported when an evaluation first selects it.
+EVALUATOR_BACKENDS = {
+    "crag": ("evaluators.cragEvaluator", "CragEvaluator"),
+    "ragas": ("evaluators.ragasEvaluator", "RagasEvaluator"),
+}
+
+# Configs whose evaluators are kept in one process; the least recently used one is dropped first
+MAX_WARM_CONFIGS = 4
+
+_warm = OrderedDict()
+_warm_lock = threading.Lock()
+
+
+def load_evaluator_class(name: str):
+    """Imports the evaluator backend registered as name and returns its class."""
+    if name not in EVALUATOR_BACKENDS:
+        raise ValueError(f"Unknown evaluator '{name}'; choose from {list(EVALUATOR_BACKENDS)}")
+    module_name, class_name = EVALUATOR_BACKENDS[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class WarmEvaluators:
+    """
+    The CRAG and Ragas evaluators of one config, built once and shared by every evaluation in the
+    process whose config is equal. setup_seconds holds how long each part took to build.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.fingerprint = config_fingerprint(config)
+        self.setup_seconds = {}
+        self._crag = None
+        self._ragas = None
+        self._lock = threading.Lock()
+
+    def _timed(self, name, build):
+        started = time.perf_counter()
+        value = build()
+        self.setup_seconds[name] = round(time.perf_counter() - started, 3)
+        return value
+
+    def crag(self, progress=None):
+        """CRAG evaluator reporting to progress; the time spent waiting for it is added to progress' setup time."""
+        started = time.perf_counter()
+        with self._lock:
+            if self._crag is None:
+                self._crag = self._timed("crag", self._build_crag)
+        if progress is not None:
+            progress.add_setup("crag", time.perf_counter() - started)
+        return self._crag.with_progress(progress)
+
+    def _build_crag(self):
+        from openai import OpenAI
+        return load_evaluator_class("crag")(self.config['openai']['model_name'], OpenAI(api_key=os.getenv("OPENAI_API_KEY")),
+                                            config=self.config)
+
+    def ragas(self, model=None, progress=None):
+        """Ragas evaluator with the models and metrics for model already built."""
+        started = time.perf_counter()
+        with self._lock:
+            if self._ragas is None:
+                self._ragas = self._timed("ragas", lambda: load_evaluator_class("ragas")(self.config))
+            ragas = self._ragas
+        key = "azure" if model == "azure" else "openai"
+        if f"ragas_{key}" not in self.setup_seconds:
+            self._timed(f"ragas_{key}", lambda: ragas.components(key))
+        if progress is not None:
+            progress.add_setup("ragas", time.perf_counter() - started)
+        return ragas.with_progress(progress)
+
+    def warm_up(self, models: Iterable[str] = ("openai",)) -> Dict[str, float]:
+        """Builds the CRAG evaluator and its tokenizer and the Ragas models and metrics of each model up front."""
+        crag = self.crag()
+        if "tokenizer" not in self.setup_seconds:
+            self._timed("tokenizer", lambda: crag.tokenizer)
+        for model in models:
+            self.ragas(model)
+        return dict(self.setup_seconds)
+
+
+def get_warm_evaluators(config: Optional[Dict] = None) -> WarmEvaluators:
+    """Returns the process-wide evaluators of config (the default config when None), creating them on first use."""
+    config = resolve_config(config)
+    fingerprint = config_fingerprint(config)
+    with _warm_lock:
+        if fingerprint in _warm:
+            _warm.move_to_end(fingerprint)
+        else:
+            _warm[fingerprint] = WarmEvaluators(config)
+            while len(_warm) > MAX_WARM_CONFIGS:
+                _warm.popitem(last=False)
+        return _warm[fingerprint]
+
+
+def warm_fingerprints():
+    """Fingerprints of the configs whose evaluators this process holds."""
+    with _warm_lock:
+        return list(_warm)
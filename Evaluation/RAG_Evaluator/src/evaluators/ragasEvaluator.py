@@ -1,5 +1,9 @@
 # src/evaluators/ragasEvaluator.py
 
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
 from datasets import Dataset
 # Ragas Metrics updated to work with latest version
 from ragas.metrics import (
@@ -7,8 +11,7 @@ from ragas.metrics import (
     Faithfulness,
     ContextRecall,
     LLMContextPrecisionWithReference,
-    AnswerCorrectness,
-    SemanticSimilarity
+    AnswerCorrectness
 )
 from langchain_openai.chat_models import AzureChatOpenAI
 from langchain_openai.embeddings import AzureOpenAIEmbeddings
@@ -18,14 +21,33 @@ from ragas.embeddings import LangchainEmbeddingsWrapper
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
 from ragas import evaluate
+from ragas.run_config import RunConfig
 from .baseEvaluator import BaseEvaluator
-from config.configManager import ConfigManager
+from .embeddingCache import CachedEmbeddings, get_embedding_cache
+from .ragasMetrics import RAGAS_METRICS, RAGAS_DEFAULT_MAX_WORKERS, select_ragas_metrics
+from .semanticSimilarity import SemanticSimilarityScorer
+from config.configManager import resolve_config
 
 
 class RagasEvaluator(BaseEvaluator):
-    def evaluate(self, queries, answers, ground_truths, contexts, model):
-        config_manager = ConfigManager()
-        config = config_manager.get_config()
+    def __init__(self, config=None, progress=None):
+        self.config = resolve_config(config)
+        # Optional ProgressTracker, told about every scored row and the tokens ragas spent
+        self.progress = progress
+        # Models, embeddings and metric objects per model, built on first use and reused by later calls
+        self._components = {}
+        self._components_lock = threading.Lock()
+
+    def components(self, model):
+        """Evaluator LLM, embeddings and metric objects for model ("azure" or OpenAI), built once."""
+        key = "azure" if model == "azure" else "openai"
+        with self._components_lock:
+            if key not in self._components:
+                self._components[key] = self.build_components(key)
+            return self._components[key]
+
+    def build_components(self, model):
+        config = self.config
         # Wrap the model in the Langchain wrapper
         if model == "azure":
             azure_llm = AzureChatOpenAI(
@@ -43,20 +65,40 @@ class RagasEvaluator(BaseEvaluator):
                 model= config["azure"]["embedding_name"],
             )
             evaluator_llm = LangchainLLMWrapper(azure_llm)
-            evaluator_embeddings = LangchainEmbeddingsWrapper(azure_embeddings)
+            embeddings, embedding_name = azure_embeddings, config["azure"]["embedding_name"]
         else:
             evaluator_llm = LangchainLLMWrapper(ChatOpenAI(model=config["openai"]["model_name"]))
-            evaluator_embeddings = LangchainEmbeddingsWrapper(OpenAIEmbeddings(model=config["openai"]["embedding_name"]))
-            
+            embeddings, embedding_name = OpenAIEmbeddings(model=config["openai"]["embedding_name"]), config["openai"]["embedding_name"]
+        embedding_cache = get_embedding_cache(config.get("embedding_cache"))
+        if embedding_cache is not None:
+            embeddings = CachedEmbeddings(embeddings, embedding_name, embedding_cache)
+        evaluator_embeddings = LangchainEmbeddingsWrapper(embeddings)
+
         # Define the metrics to evaluate and set the per metric evaluation models
-        metrics = [
-            ResponseRelevancy(llm=evaluator_llm, embeddings=evaluator_embeddings),
-            Faithfulness(llm=evaluator_llm),
-            ContextRecall(llm=evaluator_llm),
-            LLMContextPrecisionWithReference(llm=evaluator_llm, name="context_precision"),
-            AnswerCorrectness(llm=evaluator_llm, embeddings=evaluator_embeddings),
-            SemanticSimilarity(llm=evaluator_llm, embeddings=evaluator_embeddings, name="answer_similarity")
-        ]
+        metrics = {
+            "answer_relevancy": ResponseRelevancy(llm=evaluator_llm, embeddings=evaluator_embeddings),
+            "faithfulness": Faithfulness(llm=evaluator_llm),
+            "context_recall": ContextRecall(llm=evaluator_llm),
+            "context_precision": LLMContextPrecisionWithReference(llm=evaluator_llm, name="context_precision"),
+            "answer_correctness": AnswerCorrectness(llm=evaluator_llm, embeddings=evaluator_embeddings)
+        }
+        # answer_similarity is a plain cosine of two embeddings, scored locally
+        return SimpleNamespace(metrics=metrics, similarity=SemanticSimilarityScorer(embeddings),
+                               embedding_cache=embedding_cache)
+
+    def evaluate(self, queries, answers, ground_truths, contexts, model, metric_names=None, run_config=None):
+        """
+        metric_names selects a subset of RAGAS_METRICS (all of them when empty) and
+        run_config holds the ragas RunConfig overrides (max_workers, timeout, max_retries).
+        Returns (one row per input, the ragas result or None when only local metrics were scored).
+        """
+        config = self.config
+        if self.progress is not None:
+            self.progress.add_total("ragas", len(queries))
+        components = self.components(model)
+        embedding_cache = components.embedding_cache
+        metric_names = select_ragas_metrics(metric_names)
+        metrics = [components.metrics[name] for name in metric_names if name in components.metrics]
         ground_truths = [str(ground_truth).strip() for ground_truth in ground_truths]
         # Update the required columns names in the dataset
         data = {
@@ -65,13 +107,28 @@ class RagasEvaluator(BaseEvaluator):
             'retrieved_contexts': contexts,
             'reference': ground_truths
         }
-        dataset = Dataset.from_dict(data)
-        result = evaluate(dataset, metrics=metrics, token_usage_parser=get_token_usage_for_openai)
-        inputcost = config["cost_of_model"]["input"]
-        outputcost = config["cost_of_model"]["output"]
-        print(f"Total Tokens for Evaluation: Input={result.total_tokens().input_tokens} Output={result.total_tokens().output_tokens}")
-        print(f"Total Cost in $: {result.total_cost(cost_per_input_token=inputcost, cost_per_output_token=outputcost)}")
-        result_df = result.to_pandas()
+        result = None
+        if metrics:
+            dataset = Dataset.from_dict(data)
+            # Unset knobs keep the ragas defaults
+            run_config = RunConfig(**{key: value for key, value in (run_config or {}).items() if value is not None})
+            result = evaluate(dataset, metrics=metrics, run_config=run_config, token_usage_parser=get_token_usage_for_openai)
+            inputcost = config["cost_of_model"]["input"]
+            outputcost = config["cost_of_model"]["output"]
+            print(f"Total Tokens for Evaluation: Input={result.total_tokens().input_tokens} Output={result.total_tokens().output_tokens}")
+            if self.progress is not None:
+                self.progress.add_tokens("ragas", result.total_tokens().input_tokens, result.total_tokens().output_tokens)
+            print(f"Total Cost in $: {result.total_cost(cost_per_input_token=inputcost, cost_per_output_token=outputcost)}")
+            result_df = result.to_pandas()
+        else:
+            result_df = pd.DataFrame(data, columns=['user_input', 'retrieved_contexts', 'response', 'reference'])
+
+        if "answer_similarity" in metric_names:
+            result_df["answer_similarity"] = components.similarity.score(answers, ground_truths)
+        if embedding_cache is not None:
+            print(f"Embedding cache stats: {embedding_cache.summary()}")
+        if self.progress is not None:
+            self.progress.rows_done("ragas", result_df.to_dict(orient="records"))
         return result_df, result
 
     def process_results(self, results):
@@ -0,0 +1,41 @@
+# src/evaluators/ragasMetrics.py
+#
+# Ragas metric names and defaults, kept apart from ragasEvaluator so the CLI can list and check them
+# without importing ragas, langchain and datasets.
+
+import pandas as pd
+
+# Metric names accepted by --ragas_metrics, in the order the columns are reported
+RAGAS_METRICS = (
+    "answer_relevancy",
+    "faithfulness",
+    "context_recall",
+    "context_precision",
+    "answer_correctness",
+    "answer_similarity"
+)
+
+# max_workers of a default ragas RunConfig
+RAGAS_DEFAULT_MAX_WORKERS = 16
+
+
+def select_ragas_metrics(metric_names=None):
+    """Returns the requested metric names in RAGAS_METRICS order; all of them when none are given."""
+    unknown = [name for name in metric_names or [] if name not in RAGAS_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown Ragas metrics {unknown}; choose from {list(RAGAS_METRICS)}")
+    return [name for name in RAGAS_METRICS if not metric_names or name in metric_names]
+
+
+def summarize_ragas_results(results):
+    """
+    The summary of a sheet stored with its results: {metric: mean over the rows} for every metric
+    column in results, answer_similarity included. Rows without a score are left out of the mean;
+    a metric no row has a score for is None.
+    """
+    summary = {}
+    for name in RAGAS_METRICS:
+        if name in results:
+            mean = pd.to_numeric(results[name], errors="coerce").mean()
+            summary[name] = None if pd.isna(mean) else float(mean)
+    return summary
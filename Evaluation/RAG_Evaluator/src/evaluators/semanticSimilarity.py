@@ -0,0 +1,46 @@
+# src/evaluators/semanticSimilarity.py
+
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class SemanticSimilarityScorer:
+    """
+    Scores answer_similarity without going through ragas: the distinct answers and
+    ground truths are embedded in batches of batch_size texts and every row's
+    cosine similarity is computed with one matrix operation. Gives the same score
+    as ragas' SemanticSimilarity without a threshold. Rows with a blank answer or
+    ground truth are scored NaN.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = 512):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + self.batch_size]))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def score(self, answers, ground_truths) -> np.ndarray:
+        answers = [str(answer).strip() for answer in answers]
+        ground_truths = [str(ground_truth).strip() for ground_truth in ground_truths]
+        scores = np.full(len(answers), np.nan)
+        rows = [row for row, (answer, ground_truth) in enumerate(zip(answers, ground_truths))
+                if answer and ground_truth]
+        if not rows:
+            return scores
+
+        texts = list(dict.fromkeys([answers[row] for row in rows] + [ground_truths[row] for row in rows]))
+        position = {text: index for index, text in enumerate(texts)}
+        vectors = self.embed(texts)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        answer_vectors = vectors[[position[answers[row]] for row in rows]]
+        ground_truth_vectors = vectors[[position[ground_truths[row]] for row in rows]]
+        scores[rows] = np.einsum("ij,ij->i", answer_vectors, ground_truth_vectors)
+        return scores
@@ -0,0 +1,79 @@
+# src/evaluators/verdictCache.py
+
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+from utils.diskCache import DiskCache
+
+DEFAULT_VERDICT_CACHE_SETTINGS = {
+    "enabled": True,
+    "path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "cache", "crag_verdicts.sqlite"),
+    "max_entries": 500000
+}
+
+
+def normalize_text(text) -> str:
+    return " ".join(str(text).lower().split())
+
+
+class VerdictCache:
+    """
+    Persistent cache of CRAG judge verdicts keyed by the system prompt the row was
+    judged with (single-row or batch), the judge model and the normalized (query,
+    ground truth, prediction) triple. Least recently used verdicts are evicted past
+    max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self._store = DiskCache(path or DEFAULT_VERDICT_CACHE_SETTINGS["path"], max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(system_prompt: str, model_name: str, *fields) -> str:
+        """fields are the judged texts, e.g. query, ground truth and prediction, or the user message holding them."""
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        triple = "\x1f".join(normalize_text(value) for value in fields)
+        return hashlib.sha256(f"{prompt_hash}\x1e{model_name}\x1e{triple}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str, *fallback_keys: str) -> Optional[int]:
+        """Returns the verdict stored under the first key that has one; a lookup counts as one hit or miss."""
+        value = None
+        for candidate in (key, *fallback_keys):
+            value = self._store.get(candidate)
+            if value is not None:
+                break
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return int(value)
+
+    def set(self, key: str, verdict: int):
+        self._store.set(key, str(verdict).encode("utf-8"))
+
+    def summary(self, since: Optional[Dict] = None) -> Dict:
+        """Hit and miss counts of the process; with since (an earlier summary), only those counted after it."""
+        since = since or {}
+        with self._lock:
+            return {"hits": self.hits - since.get("hits", 0), "misses": self.misses - since.get("misses", 0)}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_verdict_cache(settings: Optional[Dict] = None) -> Optional[VerdictCache]:
+    """Returns the process-wide verdict cache, or None when it is disabled in the config."""
+    settings = {**DEFAULT_VERDICT_CACHE_SETTINGS, **(settings or {})}
+    if not settings.pop("enabled"):
+        return None
+    key = tuple(sorted(settings.items()))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = VerdictCache(**settings)
+        return _caches[key]
@@ -2,106 +2,426 @@ import pandas as pd
 import os
 import argparse
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from openai import OpenAI
-from config.configManager import ConfigManager
-from evaluators.ragasEvaluator import RagasEvaluator
-from evaluators.cragEvaluator import CragEvaluator
+from config.configManager import load_config, resolve_config
+from evaluators.ragasMetrics import RAGAS_METRICS, RAGAS_DEFAULT_MAX_WORKERS, select_ragas_metrics, summarize_ragas_results
+from evaluators.evaluatorRegistry import get_warm_evaluators
+from evaluators.verdictCache import get_verdict_cache
 from utils.evaluationResult import ResultsConverter
-from utils.dbservice import dbService
-
-def call_search_api(queries, ground_truths):
-    config_manager = ConfigManager()
-    config = config_manager.get_config()    
+from utils.runJournal import DEFAULT_JOURNAL_SETTINGS, RunJournal, completed_rows
+from utils.rateLimiter import DEFAULT_RATE_LIMIT_SETTINGS
+from utils.workbookLoader import read_sheet, workbook_sheet_names
+from utils.resultWriters import RESULT_FORMATS, OrderedRowWriter, open_result_sink
+from utils.dataProcessing import parse_contexts
+from utils.streamingPipeline import DEFAULT_STREAMING_SETTINGS, PipelineStage, StreamingPipeline
+from utils.progressTracker import ProgressTracker, TrackedProgressBar
+from utils.queryDedup import QueryDeduplicator, evaluation_key, fan_out, group_rows, normalize_query
+from api.searchCache import SEARCH_CACHE_MODES, get_search_cache
+
+def get_search_client(config, search_cache_mode="off"):
+    """Returns (api, get_bot_response, search_cache) for the search backend set up in the config."""
+    search_cache = get_search_cache(search_cache_mode, config.get('search_cache'))
     if config.get('SA'):
         from api.SASearch import SearchAssistAPI, get_bot_response
-        api = SearchAssistAPI()
+        api = SearchAssistAPI(search_cache=search_cache, config=config)
     elif config.get('UXO'):
         from api.XOSearch import XOSearchAPI, get_bot_response
-        api = XOSearchAPI()
-        
-    results = []
-    for query, truth in zip(queries, ground_truths):
+        api = XOSearchAPI(search_cache=search_cache, config=config)
+    return api, get_bot_response, search_cache
+
+
+# Columns of the search results file, in the order of the search response fields
+SEARCH_RESULT_COLUMNS = ('query', 'ground_truth', 'context', 'context_url', 'answer')
+
+
+def failed_search_result(query, truth):
+    return {
+        'query': query,
+        'ground_truth': truth,
+        'context': [],
+        'context_url': '',
+        'answer': "Failed to get response"
+    }
+
+
+def print_search_stats(api, search_cache, search_cache_mode):
+    print(f"Search transport stats: {api.transport.stats.summary()}")
+    if search_cache_mode != "off":
+        print(f"Search cache stats: {search_cache.summary()}")
+
+
+def call_search_api(queries, ground_truths, max_workers=1, search_cache_mode="off", on_result=None, config=None, progress=None):
+    config = resolve_config(config)
+    api, get_bot_response, search_cache = get_search_client(config, search_cache_mode)
+    progress_bar = TrackedProgressBar(total=len(queries), desc="Searching", tracker=progress, stage="search")
+
+    def fetch(index):
+        query, truth = queries[index], ground_truths[index]
         response = get_bot_response(api, query, truth)
+        progress_bar.update_rows([response])
         if response:
-            results.append(response)
+            if on_result:
+                on_result(index, response)
+            return response
+        return failed_search_result(query, truth)
+
+    with progress_bar:
+        if max_workers and max_workers > 1:
+            # executor.map yields in submission order, so results line up with the input rows
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(fetch, range(len(queries))))
         else:
-            results.append({
-                'query': query,
-                'ground_truth': truth,
-                'context': [],
-                'context_url': '',
-                'answer': "Failed to get response"
-            })
+            results = [fetch(index) for index in range(len(queries))]
+    print_search_stats(api, search_cache, search_cache_mode)
     return results
 
 
-def load_data_and_call_api(excel_file, sheet_name, config):
-    df = pd.read_excel(excel_file, sheet_name=sheet_name, engine='openpyxl')
+def load_data_and_call_api(excel_file, sheet_name, config, search_concurrency=1, search_cache_mode="off", journal=None, dedup=None, progress=None):
+    df = read_sheet(excel_file, sheet_name)
     queries = df['query'].fillna('').tolist()
     ground_truths = df['ground_truth'].fillna('').tolist()
 
-    api_results = call_search_api(queries, ground_truths)
+    # Rows answered before an interruption are taken from the journal; failed rows are retried
+    api_results_by_row = completed_rows(journal, sheet_name, 'search')
+    search_sink, saved_rows = open_search_results(excel_file, sheet_name)
+    for row in sorted(api_results_by_row):
+        saved_rows.add(row, api_results_by_row[row])
+    pending = [row for row in range(len(queries)) if row not in api_results_by_row]
+    if pending:
+        def record(position, response):
+            saved_rows.add(pending[position], response)
+            if journal is not None:
+                journal.record(sheet_name, 'search', pending[position], response)
+
+        def search_rows(rows, on_result):
+            return call_search_api([queries[row] for row in rows],
+                                   [ground_truths[row] for row in rows],
+                                   max_workers=search_concurrency,
+                                   search_cache_mode=search_cache_mode,
+                                   on_result=on_result,
+                                   config=config,
+                                   progress=progress)
+
+        if dedup is not None:
+            # Only the first row of each normalized query is searched; the other rows get a copy of its response
+            search_keys = [normalize_query(query) for query in queries]
+            pending_results = dedup.run_unique('search', pending, search_keys,
+                                               lambda row: (queries[row], ground_truths[row]), search_rows,
+                                               on_result=record)
+        else:
+            pending_results = search_rows(pending, record)
+        api_results_by_row.update(zip(pending, pending_results))
+    api_results = [api_results_by_row[row] for row in range(len(queries))]
+    return save_api_results(search_sink, saved_rows, api_results)
+
 
-    # Create a new DataFrame with API results
-    results_df = pd.DataFrame(api_results)
+def open_search_results(excel_file, sheet_name):
+    """
+    Opens the write-only workbook the search responses of a sheet are saved to. Returns (sink, rows);
+    rows.add(row, response) writes a response as soon as every row before it is in.
+    """
     current_file_dir = os.path.dirname(os.path.abspath(__file__))
     relative_output_dir = os.path.join(current_file_dir, "outputs", "sa_api_outputs")
     os.makedirs(relative_output_dir, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     base_filename = os.path.splitext(os.path.basename(excel_file))[0]
-    output_filename = f"{base_filename}_sa_api_results_{timestamp}.xlsx"
-    output_file_path = os.path.join(relative_output_dir, output_filename)
-    results_df.to_excel(output_file_path, index=False)
+    # Sheets can finish within the same second, so the sheet name keeps their files apart
+    sink = open_result_sink("xlsx", os.path.join(relative_output_dir, f"{base_filename}_{sheet_name}_sa_api_results_{timestamp}"))
+    return sink, OrderedRowWriter(sink.open_sheet("Sheet1", SEARCH_RESULT_COLUMNS))
+
 
-    print(f"API results saved to {output_file_path}")
+def save_api_results(sink, rows, api_results):
+    """
+    Writes the search responses not saved yet (failed searches, which are not reported as they finish),
+    closes the file and returns the responses as (queries, answers, ground_truths, contexts).
+    """
+    for row, response in enumerate(api_results):
+        rows.add(row, response)
+    sink.close()
+
+    print(f"API results saved to {sink.path}")
 
     # Return the data in the format expected by the evaluators
-    return (
-        results_df['query'].tolist(),
-        results_df['answer'].tolist(),
-        results_df['ground_truth'].tolist(),
-        results_df['context'].tolist()
-    )
+    return tuple([response[column] for response in api_results] for column in ('query', 'answer', 'ground_truth', 'context'))
 
 
 def load_data(excel_file, sheet_name):
-    if sheet_name:
-        df = pd.read_excel(excel_file, sheet_name=sheet_name, engine='openpyxl')
-    else:
-        df = pd.read_excel(excel_file, engine='openpyxl')
+    df = read_sheet(excel_file, sheet_name)
 
     queries = df['query'].fillna('').tolist()
     ground_truths = df['ground_truth'].fillna('').tolist()
-    contexts = df['contexts'].fillna('[]').apply(eval).tolist()
+    # Usually already parsed by the workbook loader; plain values are parsed without eval
+    contexts = parse_contexts(df['contexts'])
     answers = df['answer'].fillna('').tolist()
 
     return queries, answers, ground_truths, contexts
 
 
-def evaluate_with_ragas_and_crag(excel_file, sheet_name, config, run_ragas=True, run_crag=True, use_search_api= False, llm_model=""):
-    try:
-        if use_search_api:
-            queries, answers, ground_truths, contexts = load_data_and_call_api(excel_file, sheet_name, config)
-        else:
-            queries, answers, ground_truths, contexts = load_data(excel_file, sheet_name)
+def evaluate_pending_rows(journal, sheet_name, stage, row_count, evaluate_rows):
+    """
+    Calls evaluate_rows(pending_rows, on_result) for the rows the journal has no result for yet and
+    returns the results of all rows in row order. on_result(position, row_result) journals one row.
+    """
+    results_by_row = completed_rows(journal, sheet_name, stage)
+    pending = [row for row in range(row_count) if row not in results_by_row]
 
-        ragas_results = pd.DataFrame([])
-        crag_results = pd.DataFrame([])
-        total_set_result = {}  # Initialize as empty dict instead of None
+    def on_result(position, row_result):
+        if journal is not None:
+            journal.record(sheet_name, stage, pending[position], row_result)
 
-        if run_ragas:
-            ragas_evaluator = RagasEvaluator()
-            ragas_eval_result = ragas_evaluator.evaluate(queries, answers, ground_truths, contexts, model=llm_model)
-            ragas_results = ragas_eval_result[0]  # DataFrame
-            total_set_result = ragas_eval_result[1].__dict__ if len(ragas_eval_result) > 1 else {}  # Convert result object to dict
+    pending_results = evaluate_rows(pending, on_result) if pending else pd.DataFrame([])
+    if not results_by_row:
+        return pending_results
+    print(f"Resuming {stage} for sheet '{sheet_name}': {len(results_by_row)} rows restored from the journal, "
+          f"{len(pending)} left to evaluate.")
+    results_by_row.update(zip(pending, pending_results.to_dict(orient='records')))
+    return pd.DataFrame([results_by_row[row] for row in range(row_count)])
+
+
+def select_rows(rows, *columns):
+    return [[column[row] for row in rows] for column in columns]
+
+
+def evaluate_unique_rows(dedup, stage, keys, row_texts, evaluate_rows):
+    """Wraps evaluate_rows(rows, on_result) so rows sharing an evaluation key are evaluated once per run."""
+    def evaluate(rows, on_result):
+        return pd.DataFrame(dedup.run_unique(stage, rows, keys, row_texts, evaluate_rows, on_result=on_result))
+    return evaluate
+
+
+def stream_search_and_evaluate(excel_file, sheet_name, config, run_ragas=True, run_crag=True, llm_model="", search_concurrency=1, search_cache_mode="off", journal=None, crag_concurrency=1, crag_batch_size=1, ragas_metrics=None, ragas_run_config=None, dedup=None, progress=None):
+    """
+    Hands every search response straight to the CRAG and Ragas workers instead of waiting for the whole
+    sheet to be searched. Returns (ragas_results, crag_results) in row order.
+    """
+    df = read_sheet(excel_file, sheet_name)
+    queries = df['query'].fillna('').tolist()
+    ground_truths = df['ground_truth'].fillna('').tolist()
+    settings = {**DEFAULT_STREAMING_SETTINGS, **config.get('streaming', {})}
+    api, get_bot_response, search_cache = get_search_client(config, search_cache_mode)
+    searched_rows = completed_rows(journal, sheet_name, 'search')
+    search_sink, saved_rows = open_search_results(excel_file, sheet_name)
+    for row in sorted(searched_rows):
+        saved_rows.add(row, searched_rows[row])
+    # With dedup only the first row of each normalized query is searched. Rows sharing a search response
+    # only differ in their evaluation key by the ground truth, so the first row of each ground truth is
+    # evaluated for them.
+    rows = range(len(queries))
+    search_keys = [normalize_query(query) for query in queries] if dedup is not None else rows
+    evaluation_keys = [(search_keys[row], normalize_query(ground_truths[row])) for row in rows] if dedup is not None else rows
+    search_group_of = {group[0]: group for group in group_rows(rows, search_keys).values()}
+    evaluation_group_of = {group[0]: group for group in group_rows(rows, evaluation_keys).values()}
+    searched_with = {member: first for first, group in search_group_of.items() for member in group}
+    evaluated_rows_of = {}
+    for row in evaluation_group_of:
+        evaluated_rows_of.setdefault(searched_with[row], []).append(row)
+    if progress is not None:
+        progress.add_total('search', len([row for row in search_group_of if row not in searched_rows]))
+
+    def group_of(stage, row):
+        return search_group_of[row] if stage == 'search' else evaluation_group_of[row]
+
+    def record(stage, row, result):
+        # The result of the first row is journaled, and a search response saved, for every row of its group
+        for member in group_of(stage, row):
+            member_result = fan_out(stage, result, queries[member], ground_truths[member])
+            if stage == 'search':
+                saved_rows.add(member, member_result)
+            if journal is not None:
+                journal.record(sheet_name, stage, member, member_result)
+
+    def search(row):
+        if row in searched_rows:
+            return searched_rows[row]
+        known = dedup.get_many('search', [search_keys[row]]) if dedup is not None else {}
+        if known:
+            response = known[search_keys[row]]
+            dedup.count('search', len(search_group_of[row]), 0)
+        else:
+            response = get_bot_response(api, queries[row], ground_truths[row])
+            if progress is not None:
+                progress.rows_done('search', rows=1)
+            if dedup is not None:
+                dedup.count('search', len(search_group_of[row]), 1)
+            if not response:
+                return failed_search_result(queries[row], ground_truths[row])
+            if dedup is not None:
+                dedup.set('search', search_keys[row], response)
+        record('search', row, response)
+        return response
+
+    def journaled(stage, evaluate_responses, tracked=False):
+        # Rows evaluated before an interruption are answered from the journal
+        done = completed_rows(journal, sheet_name, stage)
+        # Stages whose evaluator does not report its own rows to the progress tracker are counted here
+        tracked = tracked and progress is not None
+        if tracked:
+            progress.add_total(stage, len([row for row in evaluation_group_of if row not in done]))
+
+        def handle(rows, responses):
+            pending = [position for position, row in enumerate(rows) if row not in done]
+            results = {}
+            if dedup is not None:
+                # Groups evaluated by an earlier sheet of the run are not evaluated again
+                keys = {position: evaluation_key(*(responses[position][key] for key in ('query', 'ground_truth', 'answer', 'context')))
+                        for position in pending}
+                known = dedup.get_many(stage, set(keys.values()))
+                results = {position: known[keys[position]] for position in pending if keys[position] in known}
+            unknown = [position for position in pending if position not in results]
+            if unknown:
+                results.update(zip(unknown, evaluate_responses([responses[position] for position in unknown])))
+            for position in pending:
+                if dedup is not None:
+                    dedup.set(stage, keys[position], results[position])
+                    dedup.count(stage, len(evaluation_group_of[rows[position]]), int(position in unknown))
+                record(stage, rows[position], results[position])
+            if tracked:
+                progress.rows_done(stage, [results[position] for position in pending])
+            return [done[row] if row in done else results[position] for position, row in enumerate(rows)]
+        return handle
+
+    def columns(responses, *keys):
+        return [[response[key] for response in responses] for key in keys]
+
+    stages = []
+    if run_crag:
+        crag_evaluator = get_warm_evaluators(config).crag(progress)
+
+        def judge(responses):
+            return crag_evaluator.judge_prepared(crag_evaluator.prepare_rows(*columns(responses, 'query', 'ground_truth', 'answer')),
+                                                 batched=crag_batch_size > 1)
+
+        stages.append(PipelineStage('crag', journaled('crag', judge, tracked=True), workers=crag_concurrency,
+                                    batch_size=crag_batch_size, queue_size=settings['queue_size']))
+    if run_ragas:
+        def score(responses):
+            ragas_eval_result = get_warm_evaluators(config).ragas(llm_model, progress).evaluate(*columns(responses, 'query', 'answer', 'ground_truth', 'context'),
+                                                          model=llm_model, metric_names=ragas_metrics, run_config=ragas_run_config)
+            return ragas_eval_result[0].to_dict(orient='records')
+
+        # Ragas parallelises its own calls, so one worker scoring a few rows at a time is enough
+        stages.append(PipelineStage('ragas', journaled('ragas', score), batch_size=settings['ragas_batch_size'],
+                                    queue_size=settings['queue_size']))
+
+    def expand(row, response):
+        # Each ground truth among the rows sharing the response is evaluated with its own texts
+        return [(first, fan_out('search', response, queries[first], ground_truths[first])) for first in evaluated_rows_of[row]]
+
+    pipeline = StreamingPipeline(search, stages, producer_workers=search_concurrency, expand=expand)
+    produced, results = pipeline.run(search_group_of)
+    print_search_stats(api, search_cache, search_cache_mode)
+    print(f"Seconds until the first streamed result: {pipeline.first_result_seconds}")
+
+    def by_row(stage, results_by_first_row):
+        # Every row gets the result of the first row of its group, with its own query and ground truth
+        by_member = {member: fan_out(stage, results_by_first_row[row], queries[member], ground_truths[member])
+                     for row in results_by_first_row for member in group_of(stage, row)}
+        return [by_member[row] for row in range(len(queries))]
+
+    save_api_results(search_sink, saved_rows, by_row('search', produced))
+    ragas_results, crag_results = (
+        pd.DataFrame(by_row(stage, results[stage])) if stage in results else pd.DataFrame([])
+        for stage in ('ragas', 'crag')
+    )
+    return ragas_results, crag_results
+
+
+def split_llm_concurrency(limit, crag_concurrency, ragas_max_workers):
+    """
+    Splits the global limit on in-flight OpenAI calls between CRAG and Ragas running side by side, in
+    proportion to what each asked for; budgets that already fit under the limit are kept as they are.
+    Each side keeps at least one call, so a limit of 1 still gives one call to each of them.
+    Returns (crag_concurrency, ragas_max_workers).
+    """
+    ragas_budget = ragas_max_workers or RAGAS_DEFAULT_MAX_WORKERS
+    if crag_concurrency + ragas_budget <= limit:
+        return crag_concurrency, ragas_max_workers
+    crag_share = max(1, min(limit - 1, limit * crag_concurrency // (crag_concurrency + ragas_budget)))
+    return crag_share, max(1, limit - crag_share)
+
+
+def evaluate_sheet(excel_file, sheet_name, config, run_ragas=True, run_crag=True, use_search_api=False, llm_model="", search_concurrency=1, search_cache_mode="off", journal=None, crag_concurrency=1, crag_batch_size=1, crag_batch_api=False, ragas_metrics=None, ragas_run_config=None, dedup=None, progress=None):
+    """Searches (or loads) the whole sheet, then evaluates it. Returns (ragas_results, crag_results) in row order."""
+    if use_search_api:
+        queries, answers, ground_truths, contexts = load_data_and_call_api(excel_file, sheet_name, config,
+                                                                             search_concurrency=search_concurrency,
+                                                                             search_cache_mode=search_cache_mode,
+                                                                             journal=journal,
+                                                                             dedup=dedup,
+                                                                             progress=progress)
+    else:
+        queries, answers, ground_truths, contexts = load_data(excel_file, sheet_name)
+
+    ragas_results = pd.DataFrame([])
+    crag_results = pd.DataFrame([])
+
+    if run_ragas:
+        ragas_batch_size = max({**DEFAULT_JOURNAL_SETTINGS, **config.get('journal', {})}['ragas_batch_size'], 1)
+
+        def evaluate_ragas_rows(rows, on_result):
+            ragas_evaluator = get_warm_evaluators(config).ragas(llm_model, progress)
+            batches = []
+            # Each batch is journaled as soon as it is scored, so an interrupted sheet keeps the batches it finished
+            for start in range(0, len(rows), ragas_batch_size):
+                ragas_eval_result = ragas_evaluator.evaluate(*select_rows(rows[start:start + ragas_batch_size], queries, answers, ground_truths, contexts),
+                                                             model=llm_model, metric_names=ragas_metrics, run_config=ragas_run_config)
+                for offset, row_result in enumerate(ragas_eval_result[0].to_dict(orient='records')):
+                    on_result(start + offset, row_result)
+                batches.append(ragas_eval_result[0])  # DataFrame
+            return pd.concat(batches, ignore_index=True)
+
+    if run_crag:
+        def evaluate_crag_rows(rows, on_result):
+            crag_evaluator = get_warm_evaluators(config).crag(progress)
+            return crag_evaluator.evaluate(*select_rows(rows, queries, answers, ground_truths, contexts),
+                                           on_result=on_result, max_concurrency=crag_concurrency,
+                                           batch_size=crag_batch_size, use_batch_api=crag_batch_api)
+
+    if dedup is not None:
+        keys = [evaluation_key(*texts) for texts in zip(queries, ground_truths, answers, contexts)]
+
+        def row_texts(row):
+            return queries[row], ground_truths[row], answers[row]
 
+        if run_ragas:
+            evaluate_ragas_rows = evaluate_unique_rows(dedup, 'ragas', keys, row_texts, evaluate_ragas_rows)
         if run_crag:
-            openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            crag_evaluator = CragEvaluator(config['openai']['model_name'], openai_client)
-            crag_results = crag_evaluator.evaluate(queries, answers, ground_truths, contexts)
-            
+            evaluate_crag_rows = evaluate_unique_rows(dedup, 'crag', keys, row_texts, evaluate_crag_rows)
+
+    if run_ragas and run_crag:
+        # Both are bound by LLM latency, so they run side by side; run() has already split the concurrency budget
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ragas_future = executor.submit(evaluate_pending_rows, journal, sheet_name, 'ragas', len(queries), evaluate_ragas_rows)
+            crag_future = executor.submit(evaluate_pending_rows, journal, sheet_name, 'crag', len(queries), evaluate_crag_rows)
+            ragas_results, crag_results = ragas_future.result(), crag_future.result()
+    elif run_ragas:
+        ragas_results = evaluate_pending_rows(journal, sheet_name, 'ragas', len(queries), evaluate_ragas_rows)
+    elif run_crag:
+        crag_results = evaluate_pending_rows(journal, sheet_name, 'crag', len(queries), evaluate_crag_rows)
+    return ragas_results, crag_results
+
+
+def evaluate_with_ragas_and_crag(excel_file, sheet_name, config, run_ragas=True, run_crag=True, use_search_api= False, llm_model="", search_concurrency=1, search_cache_mode="off", journal=None, crag_concurrency=1, crag_batch_size=1, crag_batch_api=False, ragas_metrics=None, ragas_run_config=None, streaming=False, dedup=None, progress=None):
+    try:
+        if use_search_api and streaming and not crag_batch_api:
+            ragas_results, crag_results = stream_search_and_evaluate(
+                excel_file, sheet_name, config, run_ragas=run_ragas, run_crag=run_crag, llm_model=llm_model,
+                search_concurrency=search_concurrency, search_cache_mode=search_cache_mode, journal=journal,
+                crag_concurrency=crag_concurrency, crag_batch_size=crag_batch_size, ragas_metrics=ragas_metrics,
+                ragas_run_config=ragas_run_config, dedup=dedup, progress=progress)
+        else:
+            ragas_results, crag_results = evaluate_sheet(
+                excel_file, sheet_name, config, run_ragas=run_ragas, run_crag=run_crag, use_search_api=use_search_api,
+                llm_model=llm_model, search_concurrency=search_concurrency, search_cache_mode=search_cache_mode,
+                journal=journal, crag_concurrency=crag_concurrency, crag_batch_size=crag_batch_size,
+                crag_batch_api=crag_batch_api, ragas_metrics=ragas_metrics, ragas_run_config=ragas_run_config,
+                dedup=dedup, progress=progress)
+        # Ragas scores a sheet in batches, some rows possibly restored from the journal or shared through
+        # dedup, so the summary is the mean of each metric over every row of the sheet
+        total_set_result = summarize_ragas_results(ragas_results) if run_ragas else {}
+
         result_converter = ResultsConverter(ragas_results, crag_results)
 
         if run_ragas:
@@ -126,10 +446,15 @@ def evaluate_with_ragas_and_crag(excel_file, sheet_name, config, run_ragas=True,
         return pd.DataFrame([]), {}
 
 # for running from api
-def run(input_file, sheet_name="", evaluate_ragas=False, evaluate_crag=False, use_search_api=False, llm_model=None, save_db=False):
+def run(input_file, sheet_name="", evaluate_ragas=False, evaluate_crag=False, use_search_api=False, llm_model=None, save_db=False, search_concurrency=1, search_cache="off", resume=None, crag_concurrency=1, crag_batch_size=1, crag_batch_api=False, ragas_metrics=None, ragas_max_workers=None, ragas_timeout=None, ragas_max_retries=None, streaming=False, sheet_concurrency=1, output_format="xlsx", dedup_queries=False, on_progress=None, config=None):
+    """
+    Evaluates the workbook. config is the run's own immutable config (see load_config); the default
+    config/config.json is used when it is None. on_progress(snapshot), if set, is called with a
+    ProgressTracker snapshot when the run starts, as rows finish and after each sheet.
+    """
+    journal = None
     try:
-        config_manager = ConfigManager()
-        config = config_manager.get_config()
+        config = resolve_config(config)
 
         run_ragas = evaluate_ragas
         run_crag = evaluate_crag
@@ -139,7 +464,7 @@ def run(input_file, sheet_name="", evaluate_ragas=False, evaluate_crag=False, us
         else:
             excel_file_path = input_file
             try:
-                sheet_names = pd.ExcelFile(excel_file_path, engine='openpyxl').sheet_names
+                sheet_names = workbook_sheet_names(excel_file_path)
             except Exception as e:
                 raise Exception("Error in reading the excel file: " + str(e))
         # Define the relative path directory where you want to save the output file
@@ -149,37 +474,114 @@ def run(input_file, sheet_name="", evaluate_ragas=False, evaluate_crag=False, us
 
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         base_filename = os.path.splitext(os.path.basename(input_file))[0]
-        output_filename = f"{base_filename}_evaluation_output_{timestamp}.xlsx"
-        output_file_path = os.path.join(relative_output_dir, output_filename)
+        if resume:
+            journal = RunJournal.open_existing(resume)
+            # Keep the original timestamp so the resumed run writes the same output file
+            timestamp = journal.metadata.get('timestamp', timestamp)
+            output_suffix = journal.metadata.get('output_suffix', timestamp)
+            # Journaled Ragas rows only hold the metrics the run started with
+            ragas_metrics = ragas_metrics or journal.metadata.get('ragas_metrics')
+        else:
+            journal = RunJournal.create_new(f"{base_filename}_{timestamp}")
+            # Runs of the same file started in the same second get distinct run ids; the output file follows the run id
+            output_suffix = journal.run_id[len(base_filename) + 1:]
+            journal.write_metadata(input_file=input_file, timestamp=timestamp, output_suffix=output_suffix,
+                                   ragas_metrics=ragas_metrics)
+        print(f"Run id: {journal.run_id} (use --resume {journal.run_id} to continue this run if it is interrupted)")
+        result_sink = open_result_sink(output_format, os.path.join(relative_output_dir, f"{base_filename}_evaluation_output_{output_suffix}"))
+        output_filename = os.path.basename(result_sink.path)
+        # Search and the evaluators report each finished row here; on_progress gets throttled snapshots
+        model_cost = config.get('cost_of_model', {})
+        progress = ProgressTracker(on_update=on_progress, cost_per_input_token=model_cost.get('input'),
+                                   cost_per_output_token=model_cost.get('output'), run_id=journal.run_id,
+                                   output_path=result_sink.path, sheets_total=len(sheet_names), sheets_done=0, sheet=None)
+        progress.emit(force=True)
 
         run_ragas = evaluate_ragas
         run_crag = evaluate_crag
         if not run_ragas and not run_crag:
             run_crag = True
             run_ragas = True
-
-        with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-            for sheet_name in sheet_names:
-                print(f"Processing sheet: {sheet_name}")
-                results = evaluate_with_ragas_and_crag(input_file, sheet_name, config,
-                                                    run_crag=run_crag,
-                                                    run_ragas=run_ragas,
-                                                    use_search_api=use_search_api, 
-                                                    llm_model=llm_model)
-                
-                # Handle the case where results might be None or empty
-                if results and len(results) >= 1 and not results[0].empty:
-                    results[0].to_excel(writer, sheet_name=sheet_name, index=False)
-                    if(save_db):
-                        dbService(results[0], results[1], timestamp)
-                    print(f"Results for sheet '{sheet_name}' saved to '{output_filename}'.")
-                else:
-                    print(f"No results to save for sheet '{sheet_name}'. Skipping.")
-
+        if ragas_metrics:
+            # Fail before any search or judge call is made
+            ragas_metrics = select_ragas_metrics(ragas_metrics)
+        sheet_workers = max(1, min(sheet_concurrency or 1, len(sheet_names)))
+        openai_limits = {**DEFAULT_RATE_LIMIT_SETTINGS, **config.get('rate_limits', {}).get('openai', {})}
+        # Sheets evaluated at the same time get an equal share of the OpenAI limit
+        llm_limit = max(1, openai_limits['max_concurrency'] // sheet_workers)
+        if run_ragas and run_crag:
+            crag_concurrency, ragas_max_workers = split_llm_concurrency(llm_limit, crag_concurrency, ragas_max_workers)
+            print(f"Running Ragas and CRAG concurrently: up to {crag_concurrency} CRAG and "
+                  f"{ragas_max_workers or RAGAS_DEFAULT_MAX_WORKERS} Ragas calls in flight per sheet "
+                  f"(limit {llm_limit}).")
+        elif run_ragas and sheet_workers > 1:
+            ragas_max_workers = min(ragas_max_workers or RAGAS_DEFAULT_MAX_WORKERS, llm_limit)
+        if sheet_workers > 1:
+            print(f"Evaluating {sheet_workers} sheets at a time.")
+        if streaming and crag_batch_api:
+            print("--streaming is ignored with --crag_batch_api, which judges whole sheets offline.")
+        ragas_run_config = {"max_workers": ragas_max_workers, "timeout": ragas_timeout, "max_retries": ragas_max_retries}
+        # Shared by all sheets, so a query repeated in several sheets is also searched and judged once
+        dedup = QueryDeduplicator() if dedup_queries else None
+        # The cache counts for the whole process, which may run many evaluations; only this run's lookups are reported
+        verdict_cache = get_verdict_cache(config.get('verdict_cache')) if run_crag else None
+        verdict_cache_start = verdict_cache.summary() if verdict_cache is not None else None
+
+        def evaluate_sheet_results(sheet_name):
+            print(f"Processing sheet: {sheet_name}")
+            return evaluate_with_ragas_and_crag(input_file, sheet_name, config,
+                                                run_crag=run_crag,
+                                                run_ragas=run_ragas,
+                                                use_search_api=use_search_api, 
+                                                llm_model=llm_model,
+                                                search_concurrency=search_concurrency,
+                                                search_cache_mode=search_cache,
+                                                journal=journal,
+                                                crag_concurrency=crag_concurrency,
+                                                crag_batch_size=crag_batch_size,
+                                                crag_batch_api=crag_batch_api,
+                                                ragas_metrics=ragas_metrics,
+                                                ragas_run_config=ragas_run_config,
+                                                streaming=streaming,
+                                                dedup=dedup,
+                                                progress=progress)
+
+        # Sheets are evaluated by the pool; this thread is the only writer and adds them in workbook order
+        try:
+            with ThreadPoolExecutor(max_workers=sheet_workers) as executor:
+                futures = [executor.submit(evaluate_sheet_results, sheet_name) for sheet_name in sheet_names]
+                for index, sheet_name in enumerate(sheet_names):
+                    results = futures[index].result()
+                    # Written sheets are dropped, so memory only holds the sheets still being evaluated
+                    futures[index] = None
+
+                    # Handle the case where results might be None or empty
+                    if results and len(results) >= 1 and not results[0].empty:
+                        result_sink.write_sheet(sheet_name, results[0])
+                        if(save_db):
+                            from utils.dbservice import dbService
+                            dbService(results[0], results[1], timestamp, config=config)
+                        print(f"Results for sheet '{sheet_name}' saved to '{output_filename}'.")
+                    else:
+                        print(f"No results to save for sheet '{sheet_name}'. Skipping.")
+                    progress.update_fields(sheets_done=index + 1, sheet=sheet_name)
+                    progress.emit(force=True)
+        finally:
+            result_sink.close()
+
+        if verdict_cache is not None:
+            print(f"CRAG verdict cache stats: {verdict_cache.summary(since=verdict_cache_start)}")
+        if dedup is not None:
+            print(f"Query dedup stats: {dedup.summary()}")
+        # Near zero when this process already held evaluators for an equal config
+        print(f"Evaluator setup seconds: {progress.snapshot()['setup_seconds']}")
         print(f"All results have been saved to '{output_filename}'.")
         return f"All results have been saved to '{output_filename}'."
     except Exception as e:
         raise Exception(f"RAG Evaluation has been failed with an error: {e}")
+    finally:
+        if journal is not None:
+            journal.close()
 
 def main():
     try:
@@ -192,55 +594,54 @@ def main():
         parser.add_argument('--use_search_api', action='store_true', help='Use SearchAssist API to fetch responses.')
         parser.add_argument('--llm_model', type=str, help="Use Azure OpenAI to evaluate the responses.")
         parser.add_argument('--save_db', action='store_true', help='Save the results to MongoDB.')
+        parser.add_argument('--search_concurrency', type=int, default=1, help='Number of parallel search API calls (defaults to 1).')
+        parser.add_argument('--search_cache', type=str, default='off', choices=SEARCH_CACHE_MODES,
+                            help='Search response cache mode (defaults to off).')
+        parser.add_argument('--crag_concurrency', type=int, default=1,
+                            help='Number of CRAG judge calls in flight; above 1 the async judge is used (defaults to 1).')
+        parser.add_argument('--crag_batch_size', type=int, default=1,
+                            help='Number of rows packed into one CRAG judge request (defaults to 1).')
+        parser.add_argument('--crag_batch_api', action='store_true',
+                            help='Judge CRAG rows offline through the OpenAI Batch API.')
+        parser.add_argument('--ragas_metrics', type=str, nargs='+', choices=RAGAS_METRICS,
+                            help='Ragas metrics to compute (defaults to all of them).')
+        parser.add_argument('--ragas_max_workers', type=int, help='Number of concurrent Ragas LLM calls (defaults to the ragas default).')
+        parser.add_argument('--ragas_timeout', type=int, help='Timeout in seconds for a Ragas LLM call (defaults to the ragas default).')
+        parser.add_argument('--ragas_max_retries', type=int, help='Retries for a failed Ragas LLM call (defaults to the ragas default).')
+        parser.add_argument('--sheet_concurrency', type=int, default=1,
+                            help='Number of sheets evaluated at the same time (defaults to 1).')
+        parser.add_argument('--output_format', type=str, default='xlsx', choices=RESULT_FORMATS,
+                            help='Format of the results file (defaults to xlsx).')
+        parser.add_argument('--streaming', action='store_true',
+                            help='Evaluate each row as soon as its search response arrives (with --use_search_api).')
+        parser.add_argument('--dedup_queries', action='store_true',
+                            help='Search and evaluate queries that are identical after normalization once per run.')
+        parser.add_argument('--config_file', type=str, help='Path to the config file (defaults to config/config.json).')
+        parser.add_argument('--resume', type=str, help='Run id of an interrupted run to resume.')
         args = parser.parse_args()
 
-        config_manager = ConfigManager()
-        config = config_manager.get_config()
-
-        # If no specific sheet is provided, get all sheet names
-        if args.sheet_name:
-            sheet_names = [args.sheet_name]
-        else:
-            excel_file_path = args.input_file
-            sheet_names = pd.ExcelFile(excel_file_path).sheet_names
-
-        # Define the relative path directory where you want to save the output file
-        current_file_dir = os.path.dirname(os.path.abspath(__file__))
-        relative_output_dir = os.path.join(current_file_dir, "outputs")
-        os.makedirs(relative_output_dir, exist_ok=True)
-
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        base_filename = os.path.splitext(os.path.basename(args.input_file))[0]
-        output_filename = f"{base_filename}_evaluation_output_{timestamp}.xlsx"
-        output_file_path = os.path.join(relative_output_dir, output_filename)
-
-        run_ragas = args.evaluate_ragas
-        run_crag = args.evaluate_crag
-        if not run_ragas and not run_crag:
-            run_crag = True
-            run_ragas = True
-
-        llm_model = args.llm_model
-
-        with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-            for sheet_name in sheet_names:
-                print(f"Processing sheet: {sheet_name}")
-                results = evaluate_with_ragas_and_crag(args.input_file, sheet_name, config,
-                                                       run_crag=run_crag,
-                                                       run_ragas=run_ragas,
-                                                       use_search_api=args.use_search_api, 
-                                                       llm_model=llm_model)
-                
-                # Handle the case where results might be None or empty
-                if results and len(results) >= 1 and not results[0].empty:
-                    results[0].to_excel(writer, sheet_name=sheet_name, index=False)
-                    if(args.save_db):
-                        dbService(results[0], results[1], timestamp)
-                    print(f"Results for sheet '{sheet_name}' saved to '{output_filename}'.")
-                else:
-                    print(f"No results to save for sheet '{sheet_name}'. Skipping.")
-
-        print(f"All results have been saved to '{output_filename}'.")
+        run(args.input_file,
+            sheet_name=args.sheet_name,
+            evaluate_ragas=args.evaluate_ragas,
+            evaluate_crag=args.evaluate_crag,
+            use_search_api=args.use_search_api,
+            llm_model=args.llm_model,
+            save_db=args.save_db,
+            search_concurrency=args.search_concurrency,
+            search_cache=args.search_cache,
+            resume=args.resume,
+            crag_concurrency=args.crag_concurrency,
+            crag_batch_size=args.crag_batch_size,
+            crag_batch_api=args.crag_batch_api,
+            ragas_metrics=args.ragas_metrics,
+            ragas_max_workers=args.ragas_max_workers,
+            ragas_timeout=args.ragas_timeout,
+            ragas_max_retries=args.ragas_max_retries,
+            streaming=args.streaming,
+            sheet_concurrency=args.sheet_concurrency,
+            output_format=args.output_format,
+            dedup_queries=args.dedup_queries,
+            config=load_config(args.config_file) if args.config_file else None)
     except Exception as e:
         raise Exception("RAG Evaluation has been failed with an error!!!")
 
@@ -1,13 +1,35 @@
 import sys
 import os
+import json
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from services.run_eval import runeval
+from config.configManager import ConfigManager
+from services.jobQueue import FINISHED_STATES, get_job_queue
 from services.mailService import mailService
 
-app = FastAPI()
+
+def job_queue():
+    return get_job_queue(ConfigManager().get_config().get('jobs'))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Starts the job workers, which build the evaluators of config/config.json before taking jobs,
+    # and picks up the jobs left queued or running by the previous server
+    job_queue().start()
+    yield
+    job_queue().shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15
 
 class Params(BaseModel):
     sheet_name: str = None
@@ -16,6 +38,20 @@ class Params(BaseModel):
     use_search_api: bool = False
     llm_model: str = None
     save_db: bool = False
+    search_concurrency: int = 1
+    search_cache: str = "off"
+    resume: str = None
+    crag_concurrency: int = 1
+    crag_batch_size: int = 1
+    crag_batch_api: bool = False
+    ragas_metrics: List[str] = None
+    ragas_max_workers: int = None
+    ragas_timeout: int = None
+    ragas_max_retries: int = None
+    streaming: bool = False
+    sheet_concurrency: int = 1
+    output_format: str = "xlsx"
+    dedup_queries: bool = False
 
 class Body(BaseModel):
     excel_file: str
@@ -43,21 +79,137 @@ async def run_eval(body: Body):
         "evaluate_crag": body.params.evaluate_crag,
         "use_search_api": body.params.use_search_api,
         "llm_model": body.params.llm_model,
-        "save_db": body.params.save_db
+        "save_db": body.params.save_db,
+        "search_concurrency": body.params.search_concurrency,
+        "search_cache": body.params.search_cache,
+        "resume": body.params.resume,
+        "crag_concurrency": body.params.crag_concurrency,
+        "crag_batch_size": body.params.crag_batch_size,
+        "crag_batch_api": body.params.crag_batch_api,
+        "ragas_metrics": body.params.ragas_metrics,
+        "ragas_max_workers": body.params.ragas_max_workers,
+        "ragas_timeout": body.params.ragas_timeout,
+        "ragas_max_retries": body.params.ragas_max_retries,
+        "streaming": body.params.streaming,
+        "sheet_concurrency": body.params.sheet_concurrency,
+        "output_format": body.params.output_format,
+        "dedup_queries": body.params.dedup_queries
     }
     
 
     excel_file = body.excel_file
     config_file = body.config_file
-    
+
+    for path in (excel_file, config_file):
+        if not os.path.isfile(path):
+            return JSONResponse(content={"error": f"File not found: {path}"}, status_code=400)
     try:
-        response = await runeval(excel_file, config_file, param_config)
-        return JSONResponse(content={"status": "Success", "message": f"Evaluation is successfully completed. {response}"}, status_code=200)
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+    except ValueError as e:
+        return JSONResponse(content={"error": f"Invalid config file: {e}"}, status_code=400)
+
+    try:
+        # The evaluation runs in a job process with its own config; poll /jobs/{job_id} for its status
+        job = job_queue().submit(excel_file, config_file, param_config, config)
+        return JSONResponse(content={"status": "Queued", "job_id": job["id"], "message": "Evaluation job is queued."}, status_code=202)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
-    
+
+
+@app.get('/ready')
+def ready():
+    """Readiness probe: 200 once every job worker has warmed up its evaluators, 503 until then."""
+    status = job_queue().status()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+
+def find_job(job_id):
+    job = job_queue().store.get(job_id)
+    if job is None:
+        return None, JSONResponse(content={"error": f"Job '{job_id}' not found"}, status_code=404)
+    return job, None
+
+
+@app.get('/jobs/{job_id}')
+def job_status(job_id: str):
+    job, error = find_job(job_id)
+    if error:
+        return error
+    # The config snapshot holds credentials, so it is not returned
+    return JSONResponse(content={key: value for key, value in job.items() if key != "config"}, status_code=200)
+
+
+@app.get('/jobs/{job_id}/progress')
+def job_progress(job_id: str):
+    job, error = find_job(job_id)
+    return error or JSONResponse(content={"status": job["status"], "progress": job["progress"]}, status_code=200)
+
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get('/jobs/{job_id}/events')
+async def job_events(job_id: str, request: Request):
+    """
+    Streams the job's progress as server-sent events: a progress event whenever its snapshot
+    changes and an end event once the job has finished.
+    """
+    job, error = find_job(job_id)
+    if error:
+        return error
+    store = job_queue().store
+
+    async def events():
+        last, last_sent = None, time.monotonic()
+        while not await request.is_disconnected():
+            # The job process writes its progress to the job store; reading it is blocking
+            job = await asyncio.to_thread(store.get, job_id)
+            current = {"status": job["status"], "progress": job["progress"]}
+            if current != last:
+                last, last_sent = current, time.monotonic()
+                yield server_sent_event("progress", current)
+            elif time.monotonic() - last_sent >= EVENT_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                # Comment line, so proxies do not close an idle stream
+                yield ": keep-alive\n\n"
+            if job["status"] in FINISHED_STATES:
+                yield server_sent_event("end", {"status": job["status"], "error": job["error"]})
+                return
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post('/jobs/{job_id}/cancel')
+def cancel_job(job_id: str):
+    job, error = find_job(job_id)
+    if error:
+        return error
+    if job["status"] in FINISHED_STATES:
+        return JSONResponse(content={"error": f"Job '{job_id}' is already {job['status']}"}, status_code=409)
+    job = job_queue().cancel(job_id)
+    return JSONResponse(content={"status": job["status"], "job_id": job_id}, status_code=200)
+
+
+@app.get('/jobs/{job_id}/result')
+def job_result(job_id: str):
+    job, error = find_job(job_id)
+    if error:
+        return error
+    if job["status"] != "succeeded":
+        return JSONResponse(content={"error": f"Job '{job_id}' is {job['status']}; results are available once it succeeds"}, status_code=409)
+    path = job_queue().result_file(job)
+    if path is None:
+        return JSONResponse(content={"error": f"No results file for job '{job_id}'"}, status_code=404)
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+# A plain def runs in the threadpool, so sending mails does not hold up the event loop
 @app.post('/mailService')
-async def mail_service(send_mail: bool = False):
+def mail_service(send_mail: bool = False):
     try:
         mailService(sendMail = send_mail)
         return JSONResponse(content={"status": "Success", "message": "Mail content generated successfully"}, status_code=200)
@@ -0,0 +1,362 @@
+# src/services/jobQueue.py
+
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from config.configManager import ConfigManager, config_fingerprint, freeze_config, load_config
+
+JOBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "jobs")
+
+DEFAULT_JOB_SETTINGS = {
+    "max_workers": 1,
+    "poll_seconds": 1.0,
+    "warm_up": True,
+    "warm_models": ["openai"]
+}
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+_JSON_FIELDS = ("params", "progress", "config")
+
+_queues = {}
+_lock = threading.Lock()
+
+
+class JobStore:
+    """
+    SQLite table of evaluation jobs. The API process and every job process open it on their own,
+    so each write is a single transaction and state changes are compare-and-set on the status.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, excel_file TEXT NOT NULL, config_file TEXT NOT NULL, "
+                "params TEXT NOT NULL, run_id TEXT, progress TEXT, result_path TEXT, message TEXT, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, config TEXT)"
+            )
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "config" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN config TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @staticmethod
+    def _encode(fields: Dict) -> Dict:
+        return {key: json.dumps(value) if key in _JSON_FIELDS and value is not None else value
+                for key, value in fields.items()}
+
+    @staticmethod
+    def _decode(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        for key in _JSON_FIELDS:
+            job[key] = json.loads(job[key]) if job[key] is not None else None
+        return job
+
+    def create(self, excel_file: str, config_file: str, params: Dict, config: Dict) -> Dict:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, excel_file, config_file, params, config, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, excel_file, config_file, json.dumps(params), json.dumps(config), time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._decode(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (status,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def update(self, job_id: str, from_states=None, **fields) -> bool:
+        """Sets fields on the job; with from_states, only if its status is one of them. Returns whether it changed."""
+        fields = self._encode(fields)
+        query = f"UPDATE jobs SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?"
+        values = list(fields.values()) + [job_id]
+        if from_states:
+            query += f" AND status IN ({','.join('?' * len(from_states))})"
+            values += list(from_states)
+        with self._lock, self._conn:
+            return self._conn.execute(query, values).rowcount > 0
+
+    def log_path(self, job_id: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), f"{job_id}.log")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def run_job(job_id: str, store_path: str):
+    """Runs one job in a worker process and records the outcome in the job store; its output goes to the job log."""
+    store = JobStore(store_path)
+    job = store.get(job_id)
+    log = open(store.log_path(job_id), "a", encoding="utf-8", buffering=1)
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = log
+    # The worker imported loguru before this job, so its default handler still writes to the console
+    log_handler = logger.add(log)
+    try:
+        from services.run_eval import run_with_params
+        # Jobs stored before configs were snapshotted read their config file
+        config = freeze_config(job["config"]) if job["config"] is not None else load_config(job["config_file"])
+
+        def on_progress(progress):
+            store.update(job_id, progress=progress, run_id=progress["run_id"], result_path=progress["output_path"])
+
+        message = run_with_params(job["excel_file"], job["params"], config=config, on_progress=on_progress)
+        store.update(job_id, ("running",), status="succeeded", message=message, finished_at=time.time())
+    except BaseException as e:
+        traceback.print_exc()
+        store.update(job_id, ("running",), status="failed", error=str(e), finished_at=time.time())
+    finally:
+        # Evaluators stay warm for the next job, but the job's input workbook is not kept
+        from utils.workbookLoader import clear_workbooks
+        clear_workbooks()
+        logger.remove(log_handler)
+        sys.stdout, sys.stderr = stdout, stderr
+        log.close()
+        store.close()
+
+
+def job_worker(connection, store_path: str, settings: Dict):
+    """
+    Entry point of a worker process: builds the evaluators of the default config, then runs the
+    jobs it is sent one after another, so jobs with an equal config start with warm evaluators.
+    """
+    from evaluators.evaluatorRegistry import get_warm_evaluators, warm_fingerprints
+    ready = {"setup_seconds": {}, "error": None}
+    if settings["warm_up"]:
+        try:
+            ready["setup_seconds"] = get_warm_evaluators(ConfigManager().get_config()).warm_up(settings["warm_models"])
+        except Exception as e:
+            # Jobs still run; they build what they need themselves
+            traceback.print_exc()
+            ready["error"] = f"Warm-up failed: {e}"
+    connection.send(("ready", {**ready, "fingerprints": warm_fingerprints()}))
+    while True:
+        try:
+            job_id = connection.recv()
+        except EOFError:
+            return
+        run_job(job_id, store_path)
+        connection.send(("done", {"job_id": job_id, "fingerprints": warm_fingerprints()}))
+
+
+class JobWorker:
+    """A worker process of the queue and the job it is running, as seen from the API process."""
+
+    def __init__(self, context, store_path: str, settings: Dict, name: str):
+        self.name = name
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=job_worker, args=(child_connection, store_path, settings), name=name)
+        self.process.start()
+        child_connection.close()
+        self.started_at = time.time()
+        self.warm = False
+        self.setup_seconds = None
+        self.error = None
+        self.fingerprints = []
+        self.job_id = None
+
+    def receive(self):
+        """Handles the messages the worker sent since the last call."""
+        try:
+            while self.connection.poll():
+                kind, message = self.connection.recv()
+                self.fingerprints = message["fingerprints"]
+                if kind == "ready":
+                    self.warm = True
+                    self.setup_seconds, self.error = message["setup_seconds"], message["error"]
+                elif kind == "done" and message["job_id"] == self.job_id:
+                    self.job_id = None
+        except (EOFError, OSError):
+            pass
+
+    def status(self) -> Dict:
+        state = "busy" if self.job_id else ("ready" if self.warm else "warming")
+        return {"name": self.name, "state": state, "job_id": self.job_id, "setup_seconds": self.setup_seconds,
+                "error": self.error, "warm_configs": list(self.fingerprints)}
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+class JobQueue:
+    """
+    Runs queued jobs, oldest first, on max_workers worker processes, so an evaluation never blocks
+    the API. Workers live as long as the server and keep their evaluators warm between jobs. The
+    queue lives in the job store: after a restart queued jobs are picked up again and jobs that
+    were running resume from their run journal.
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = 1, poll_seconds: float = 1.0, warm_up: bool = True,
+                 warm_models=("openai",)):
+        self.store = store
+        self.max_workers = max(max_workers or 1, 1)
+        self.poll_seconds = poll_seconds
+        self.worker_settings = {"warm_up": warm_up, "warm_models": list(warm_models or [])}
+        self._workers = []
+        self._worker_count = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # Worker processes do not inherit the API's threads or open connections
+        self._context = multiprocessing.get_context("spawn")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._recover()
+        with self._lock:
+            self._workers = [self._new_worker() for _ in range(self.max_workers)]
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _new_worker(self) -> JobWorker:
+        self._worker_count += 1
+        return JobWorker(self._context, self.store.path, self.worker_settings, f"job-worker-{self._worker_count}")
+
+    def _recover(self):
+        # Jobs still marked running were stopped with the previous server
+        for job in self.store.list("running"):
+            params = {**job["params"], "resume": job["run_id"]} if job["run_id"] else job["params"]
+            self.store.update(job["id"], ("running",), status="queued", params=params)
+            print(f"Job {job['id']} was interrupted; queued again" + (f" to resume run {job['run_id']}." if job["run_id"] else "."))
+
+    def submit(self, excel_file: str, config_file: str, params: Dict, config: Dict) -> Dict:
+        """Queues a job; config is the parsed config file, kept with the job so later edits to the file do not affect it."""
+        job = self.store.create(excel_file, config_file, params, config)
+        self._wake.set()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancels a queued or running job; a running job's worker is terminated and replaced. Returns the job."""
+        if self.store.update(job_id, ("queued",), status="cancelled", finished_at=time.time()):
+            return self.store.get(job_id)
+        if self.store.update(job_id, ("running",), status="cancelled", finished_at=time.time()):
+            with self._lock:
+                worker = next((worker for worker in self._workers if worker.job_id == job_id), None)
+            if worker is not None:
+                worker.process.terminate()
+            self._wake.set()
+        return self.store.get(job_id)
+
+    def _reap(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.receive()
+            if worker.process.is_alive():
+                continue
+            worker.process.join()
+            # Only a worker that died without reporting its job's outcome still leaves the job running
+            if worker.job_id is not None:
+                self.store.update(worker.job_id, ("running",), status="failed", finished_at=time.time(),
+                                  error=f"Job process exited with code {worker.process.exitcode}")
+            worker.connection.close()
+            with self._lock:
+                self._workers[self._workers.index(worker)] = self._new_worker()
+
+    def _start_next(self) -> bool:
+        with self._lock:
+            idle = [worker for worker in self._workers if worker.warm and worker.job_id is None]
+        if not idle:
+            return False
+        for job in self.store.list("queued"):
+            if self.store.update(job["id"], ("queued",), status="running", started_at=time.time()):
+                # A worker that already holds evaluators for the job's config is preferred
+                fingerprint = config_fingerprint(job["config"]) if job["config"] is not None else None
+                worker = next((worker for worker in idle if fingerprint in worker.fingerprints), idle[0])
+                with self._lock:
+                    worker.job_id = job["id"]
+                worker.connection.send(job["id"])
+                # A cancel that came in before the worker was assigned could not terminate it
+                if self.store.get(job["id"])["status"] == "cancelled":
+                    worker.process.terminate()
+                return True
+        return False
+
+    def _dispatch(self):
+        while not self._stop.is_set():
+            try:
+                self._reap()
+                while self._start_next():
+                    pass
+            except Exception:
+                print(f"Job dispatcher error: {traceback.format_exc()}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def status(self) -> Dict:
+        """Readiness of the queue: ready once every worker has warmed up without errors."""
+        with self._lock:
+            workers = [worker.status() for worker in self._workers]
+        ready = self._thread is not None and bool(workers) and all(
+            worker["state"] != "warming" and not worker["error"] for worker in workers)
+        return {"ready": ready, "workers": workers, "queued": len(self.store.list("queued"))}
+
+    def shutdown(self):
+        """Stops dispatching and terminates the workers; running jobs stay marked running and resume on the next start."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def result_file(self, job: Dict) -> Optional[str]:
+        """Path of the job's results file; a Parquet results directory is zipped next to the job log first."""
+        path = job.get("result_path")
+        if not path or not os.path.exists(path):
+            return None
+        if os.path.isdir(path):
+            archive = os.path.splitext(self.store.log_path(job["id"]))[0]
+            if not os.path.exists(archive + ".zip"):
+                shutil.make_archive(archive, "zip", path)
+            return archive + ".zip"
+        return path
+
+
+def get_job_queue(settings: Optional[Dict] = None, jobs_dir: str = JOBS_DIR) -> JobQueue:
+    """Returns the process-wide job queue, creating it on first use."""
+    settings = {**DEFAULT_JOB_SETTINGS, **(settings or {})}
+    with _lock:
+        if jobs_dir not in _queues:
+            _queues[jobs_dir] = JobQueue(JobStore(os.path.join(jobs_dir, "jobs.sqlite")),
+                                         max_workers=settings["max_workers"], poll_seconds=settings["poll_seconds"],
+                                         warm_up=settings["warm_up"], warm_models=settings["warm_models"])
+        return _queues[jobs_dir]
@@ -1,14 +1,12 @@
 import pandas as pd
 from pymongo import MongoClient
-from config.configManager import ConfigManager
+from config.configManager import resolve_config
 import os
 import numpy as np
 
-config_manager = ConfigManager()
-config = config_manager.get_config()
 
-
-def fetch_last_5_testsets():
+def fetch_last_5_testsets(config=None):
+    config = resolve_config(config)
     try:
         # MongoDB connection setup
         client = MongoClient(config["MongoDB"]["url"])
@@ -190,9 +188,9 @@ def send_mail():
 
 
 # Main logic
-def mailService(sendMail):
+def mailService(sendMail, config=None):
     # Fetch the last 5 test set records (_id = 0 from each collection)
-    records = fetch_last_5_testsets()
+    records = fetch_last_5_testsets(config)
 
     # Check the latest record (last in the fetched list)
     latest_record = records[-1]
@@ -1,44 +1,30 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
-from werkzeug.utils import secure_filename
-import pandas as pd
 from main import run
 
-async def process_files(excel_file, config_file):
-    # Configure upload folder
-    INPUT_UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "../")
-    CONFIG_UPLOAD_FOLDER = os.path.join(INPUT_UPLOAD_FOLDER, "config")
-    
-    excel_file_name = excel_file.split("/")[-1]
-    print("excel_file_name:", excel_file_name)
-    
-    excel_filename = secure_filename(excel_file_name)
-    print("excel_filename:", excel_filename)
-    
 
-    excel_path = os.path.join(INPUT_UPLOAD_FOLDER, excel_filename)
-    config_path = os.path.join(CONFIG_UPLOAD_FOLDER, 'config.json')
-    
-    # Save the uploaded files
-    with open(config_file, 'r') as f:
-        s = f.read()
-        with open(config_path, 'w') as f2:
-            f2.write(s)
-            
-    excelFile = pd.read_excel(excel_file)
-    excelFile.to_excel(excel_path, index=False)
-    
-    return excel_path
-
-
-async def runeval(excel_file, config_file, params):
-    
-    excel_path = await process_files(excel_file, config_file)
-    try:
-        return run(excel_path, evaluate_ragas=params.get("evaluate_ragas"), evaluate_crag=params.get("evaluate_crag"), use_search_api=params.get("use_search_api"), llm_model=params.get("llm_model"), save_db=params.get("save_db"))
-    except Exception as e:
-        raise Exception("Error in running evaluation: " + str(e))
-    
-    
-    
+def run_with_params(excel_path, params, config=None, on_progress=None):
+    return run(excel_path,
+               sheet_name=params.get("sheet_name") or "",
+               evaluate_ragas=params.get("evaluate_ragas"),
+               evaluate_crag=params.get("evaluate_crag"),
+               use_search_api=params.get("use_search_api"),
+               llm_model=params.get("llm_model"),
+               save_db=params.get("save_db"),
+               search_concurrency=params.get("search_concurrency", 1),
+               search_cache=params.get("search_cache", "off"),
+               resume=params.get("resume"),
+               crag_concurrency=params.get("crag_concurrency", 1),
+               crag_batch_size=params.get("crag_batch_size", 1),
+               crag_batch_api=params.get("crag_batch_api", False),
+               ragas_metrics=params.get("ragas_metrics"),
+               ragas_max_workers=params.get("ragas_max_workers"),
+               ragas_timeout=params.get("ragas_timeout"),
+               ragas_max_retries=params.get("ragas_max_retries"),
+               streaming=params.get("streaming", False),
+               sheet_concurrency=params.get("sheet_concurrency", 1),
+               output_format=params.get("output_format", "xlsx"),
+               dedup_queries=params.get("dedup_queries", False),
+               on_progress=on_progress,
+               config=config)
@@ -0,0 +1,37 @@
+# src/tests/conftest.py
+#
+# Tests run from any directory: src is put on the path, and made the working directory because the
+# prompts and output folders are resolved relative to it, as when running main.py.
+
+import os
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+sys.path.insert(0, SRC_DIR)
+os.chdir(SRC_DIR)
+
+import pytest
+
+from openaiStub import OpenAIStub
+
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """Offline stand-in for bert-base-uncased: every word and punctuation mark is one token."""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+
+    from utils import dataProcessing
+
+    tokenizer = Tokenizer(models.WordLevel(vocab={"[UNK]": 0}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]")
+    monkeypatch.setitem(dataProcessing._tokenizers, "bert-base-uncased", tokenizer)
+    return tokenizer
+
+
+@pytest.fixture
+def openai_stub():
+    stub = OpenAIStub(delay=0.05).start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,167 @@
+# src/tests/openaiStub.py
+#
+# Local stand-in for the OpenAI endpoints the CRAG judge calls, chat completions and the Batch API, so the
+# judge can be tested end to end without network access. A prediction is judged correct when it contains the word "correct".
+
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def judge_prediction(prediction):
+    return "true" if "correct" in re.findall(r"[a-z]+", prediction.lower()) else "false"
+
+
+class OpenAIStub:
+    """
+    Serves /v1/chat/completions and the files and batches endpoints of the Batch API on a free local
+    port. delay holds every chat reply back, so concurrent calls overlap; requests and max_in_flight
+    tell what the client sent and how many calls it had open. A batch completes on its second poll,
+    and the requests whose custom_id is in failed_ids fail inside it.
+    """
+
+    def __init__(self, delay=0.0, failed_ids=()):
+        self.delay = delay
+        self.failed_ids = set(failed_ids)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {}
+        self.batches = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def chat_completion(self, body):
+        user = body["messages"][-1]["content"]
+        try:
+            items = json.loads(user)["items"]
+        except (ValueError, KeyError, TypeError):
+            content = {"accuracy": judge_prediction(user.split("Prediction:")[-1])}
+        else:
+            content = {"verdicts": [{"id": item["id"], "accuracy": judge_prediction(item["prediction"])} for item in items]}
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(content)}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+        }
+
+    def create_file(self, content, purpose):
+        file_id = f"file-{next(self._ids)}"
+        self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": f"{file_id}.jsonl", "purpose": purpose, "status": "processed"}
+
+    def create_batch(self, body):
+        batch_id = f"batch_{next(self._ids)}"
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": body["endpoint"], "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"], "status": "in_progress", "created_at": int(time.time()),
+            "output_file_id": None, "polls": 0,
+        }
+        return self.batch_view(batch_id)
+
+    def retrieve_batch(self, batch_id):
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["status"] == "in_progress" and batch["polls"] >= 2:
+            lines = []
+            for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+                request = json.loads(line)
+                if request["custom_id"] in self.failed_ids:
+                    response = {"status_code": 500, "body": {"error": {"message": "internal error"}}}
+                else:
+                    response = {"status_code": 200, "body": self.chat_completion(request["body"])}
+                lines.append(json.dumps({"id": f"req-{next(self._ids)}", "custom_id": request["custom_id"],
+                                         "response": response, "error": None}))
+            batch["output_file_id"] = self.create_file("\n".join(lines).encode("utf-8"), "batch_output")["id"]
+            batch["status"] = "completed"
+        return self.batch_view(batch_id)
+
+    def batch_view(self, batch_id):
+        return {key: value for key, value in self.batches[batch_id].items() if key != "polls"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def read_body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_GET(self):
+                parts = self.path.split("?")[0].strip("/").split("/")
+                with stub._lock:
+                    if parts[1:2] == ["batches"] and len(parts) == 3 and parts[2] in stub.batches:
+                        return self.send_json(200, stub.retrieve_batch(parts[2]))
+                    if parts[1:2] == ["files"] and parts[3:] == ["content"] and parts[2] in stub.files:
+                        data = stub.files[parts[2]]
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/octet-stream")
+                        self.send_header("Content-Length", str(len(data)))
+                        self.end_headers()
+                        return self.wfile.write(data)
+                self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_POST(self):
+                body = self.read_body()
+                if self.path.endswith("/files"):
+                    form = BytesParser(policy=HTTP).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+                    fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                              for part in form.iter_parts()}
+                    with stub._lock:
+                        return self.send_json(200, stub.create_file(fields["file"], fields["purpose"].decode()))
+                if self.path.endswith("/batches"):
+                    with stub._lock:
+                        return self.send_json(200, stub.create_batch(json.loads(body)))
+                if not self.path.endswith("/chat/completions"):
+                    return self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                request = json.loads(body)
+                with stub._lock:
+                    stub.requests.append(request)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    self.send_json(200, stub.chat_completion(request))
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+        return Handler
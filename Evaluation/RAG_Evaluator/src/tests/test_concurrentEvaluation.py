@@ -0,0 +1,83 @@
+# src/tests/test_concurrentEvaluation.py
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import main
+from evaluators.ragasMetrics import RAGAS_DEFAULT_MAX_WORKERS
+
+
+@pytest.mark.parametrize("limit, crag_concurrency, ragas_max_workers, expected", [
+    # Budgets that fit are kept, including the ragas default
+    (32, 4, None, (4, None)),
+    (32, 8, 8, (8, 8)),
+    # Otherwise the limit is shared in proportion to what each asked for
+    (16, 16, 16, (8, 8)),
+    (16, 8, None, (16 * 8 // (8 + RAGAS_DEFAULT_MAX_WORKERS), 16 - 16 * 8 // (8 + RAGAS_DEFAULT_MAX_WORKERS))),
+    (4, 1, 100, (1, 3)),
+    (4, 100, 1, (3, 1)),
+    (2, 8, 8, (1, 1)),
+    # No side is left without a call
+    (1, 4, None, (1, 1)),
+    (1, 1, 1, (1, 1)),
+])
+def test_split_llm_concurrency(limit, crag_concurrency, ragas_max_workers, expected):
+    assert main.split_llm_concurrency(limit, crag_concurrency, ragas_max_workers) == expected
+
+
+@pytest.mark.parametrize("limit", range(2, 40))
+def test_split_llm_concurrency_stays_under_the_limit(limit):
+    crag, ragas = main.split_llm_concurrency(limit, 12, None)
+    ragas = ragas or RAGAS_DEFAULT_MAX_WORKERS
+    assert crag >= 1 and ragas >= 1
+    assert crag + ragas <= limit
+
+
+# Row 3 repeats the query of row 0 with another answer, so rows can only pair up by occurrence
+ROWS = (["q0", "q1", "q2", "q0"], ["a0", "a1", "a2", "a3"], ["t0", "t1", "t2", "t3"], [[]] * 4)
+
+
+class FakeRagas:
+    def __init__(self, both_running):
+        self.both_running = both_running
+
+    def evaluate(self, queries, answers, ground_truths, contexts, model, metric_names=None, run_config=None):
+        self.both_running.wait()
+        return pd.DataFrame({"user_input": queries, "response": answers, "reference": ground_truths,
+                             "faithfulness": [float(answer[1:]) for answer in answers]}), None
+
+
+class FakeCrag:
+    """Finishes its rows in reverse order, and only once Ragas is running too."""
+
+    def __init__(self, both_running):
+        self.both_running = both_running
+
+    def evaluate(self, queries, answers, ground_truths, contexts, on_result=None, **kwargs):
+        self.both_running.wait()
+        results = {}
+        for row in reversed(range(len(queries))):
+            time.sleep(0.01)
+            results[row] = {"query": queries[row], "ground_truth": ground_truths[row], "prediction": answers[row],
+                            "score": float(answers[row][1:])}
+            on_result(row, results[row])
+        return pd.DataFrame([results[row] for row in range(len(queries))])
+
+
+def test_ragas_and_crag_run_side_by_side_and_merge_in_row_order(monkeypatch):
+    both_running = threading.Barrier(2, timeout=5)
+    ragas, crag = FakeRagas(both_running), FakeCrag(both_running)
+    warm = type("Warm", (), {"ragas": lambda self, model, progress=None: ragas,
+                             "crag": lambda self, progress=None: crag})()
+    monkeypatch.setattr(main, "load_data", lambda excel_file, sheet_name: ROWS)
+    monkeypatch.setattr(main, "get_warm_evaluators", lambda config: warm)
+
+    results, summary = main.evaluate_with_ragas_and_crag("book.xlsx", "S1", {})
+    assert results["user_input"].tolist() == ROWS[0]
+    # Every row keeps its own Ragas and CRAG result, including the repeated query
+    assert results["response"].tolist() == results["answer"].tolist() == ROWS[1]
+    assert results["score"].tolist() == results["faithfulness"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert summary == {"faithfulness": 1.5}
@@ -0,0 +1,63 @@
+# src/tests/test_cragBatchJob.py
+
+import json
+
+import openai
+import pytest
+
+from evaluators.cragBatchJob import CragBatchJob
+from evaluators.cragEvaluator import CragEvaluator
+from openaiStub import OpenAIStub
+
+CONFIG = {"verdict_cache": {"enabled": False}, "rate_limits": {"openai": {"rate": 1000.0, "burst": 1000}}}
+
+
+@pytest.fixture
+def batch_stub():
+    stub = OpenAIStub(failed_ids={"rows-4-5"}).start()
+    yield stub
+    stub.stop()
+
+
+def chat_request(prediction):
+    return {"model": "judge-model", "response_format": {"type": "json_object"},
+            "messages": [{"role": "user", "content": f"Question: q\\n Ground truth: t\\n Prediction: {prediction}\\n"}]}
+
+
+def test_batch_job_round_trip(batch_stub, tmp_path):
+    client = openai.OpenAI(api_key="test", base_url=batch_stub.url)
+    job = CragBatchJob(client, work_dir=str(tmp_path), poll_interval_seconds=0)
+    requests = {"a": chat_request("correct"), "b": chat_request("wrong"), "rows-4-5": chat_request("correct")}
+
+    replies = job.run(requests)
+    # The request that failed inside the batch is left out for the caller to retry
+    assert {custom_id: json.loads(reply) for custom_id, reply in replies.items()} == {
+        "a": {"accuracy": "true"}, "b": {"accuracy": "false"}}
+    assert len(batch_stub.batches) == 1
+    uploaded = [json.loads(line) for line in batch_stub.files["file-1"].decode().splitlines()]
+    assert [(line["custom_id"], line["url"]) for line in uploaded] == [
+        ("a", "/v1/chat/completions"), ("b", "/v1/chat/completions"), ("rows-4-5", "/v1/chat/completions")]
+
+    # The same requests again reuse the submitted batch instead of paying for a new one
+    assert job.run(requests) == replies
+    assert len(batch_stub.batches) == 1
+
+
+def test_offline_judging_end_to_end(batch_stub, word_tokenizer, tmp_path):
+    evaluator = CragEvaluator("judge-model", openai.OpenAI(api_key="test", base_url=batch_stub.url), config=CONFIG)
+    job = CragBatchJob(evaluator.openai_client, work_dir=str(tmp_path), poll_interval_seconds=0)
+    queries = [f"question {index}" for index in range(7)]
+    answers = ["the correct answer", "wrong", "i don't know", "truth 3", "correct", "correct too", "wrong again"]
+    ground_truths = [f"truth {index}" for index in range(7)]
+
+    results = evaluator.evaluate_offline(queries, answers, ground_truths, [[]] * 7, batch_size=2, batch_job=job)
+    assert results["query"].tolist() == queries
+    # Row 2 is missing and row 3 an exact match, so neither is sent to the judge
+    assert results["accuracy"].tolist() == [1, 0, 0, 1, 1, 1, 0]
+    assert results["missing"].tolist() == [0, 0, 1, 0, 0, 0, 0]
+    assert results["n_correct_exact"].tolist() == [0, 0, 0, 1, 0, 0, 0]
+    uploaded = [json.loads(line)["custom_id"] for line in batch_stub.files["file-1"].decode().splitlines()]
+    assert uploaded == ["rows-0-1", "rows-4-5", "rows-6-6"]
+    # The rows of the failed batch request were judged with regular calls, one per row
+    assert [request["messages"][-1]["content"].split("\\n")[0] for request in batch_stub.requests] == [
+        "Question: question 4", "Question: question 5"]
@@ -0,0 +1,164 @@
+# src/tests/test_cragEvaluator.py
+
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from evaluators.cragEvaluator import CragEvaluator
+from evaluators.verdictCache import VerdictCache
+
+CONFIG = {"verdict_cache": {"enabled": False}, "rate_limits": {"openai": {"rate": 1000.0, "burst": 1000}}}
+
+
+def api_error(status_code):
+    request = httpx.Request("POST", "http://judge.test/v1/chat/completions")
+    return openai.APIStatusError(f"status {status_code}", response=httpx.Response(status_code, request=request), body=None)
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def make_evaluator(replies):
+    """CragEvaluator whose client returns (or raises) replies in order; calls holds the messages it was sent."""
+    calls = []
+
+    def create(model, messages, response_format):
+        calls.append(messages)
+        reply = replies[min(len(calls), len(replies)) - 1]
+        if isinstance(reply, Exception):
+            raise reply
+        return completion(reply)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    evaluator = CragEvaluator("judge-model", client, config=CONFIG)
+    evaluator.rate_limiter.backoff_delay = lambda attempt: 0
+    return evaluator, calls
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 403, 404])
+def test_permanent_errors_are_not_retried(status_code):
+    evaluator, calls = make_evaluator([api_error(status_code)])
+    assert evaluator.attempt_api_call([{"role": "user", "content": "q"}]) is None
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("error", [api_error(500), api_error(502),
+                                   openai.APIConnectionError(request=httpx.Request("POST", "http://judge.test"))])
+def test_transient_errors_are_retried(error):
+    evaluator, calls = make_evaluator([error, '{"accuracy": "true"}'])
+    assert evaluator.attempt_api_call([{"role": "user", "content": "q"}]) == '{"accuracy": "true"}'
+    assert len(calls) == 2
+
+
+def test_gives_up_after_max_retries_without_a_last_sleep(monkeypatch):
+    evaluator, calls = make_evaluator([api_error(500)])
+    sleeps = []
+    monkeypatch.setattr("evaluators.cragEvaluator.time.sleep", sleeps.append)
+    assert evaluator.attempt_api_call([{"role": "user", "content": "q"}], max_retries=3) is None
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def judged_rows(count):
+    queries = [f"question {index}" for index in range(count)]
+    answers = [f"answer {index} is {'correct' if index % 3 else 'wrong'}" for index in range(count)]
+    return queries, answers, [f"truth {index}" for index in range(count)], [[] for _ in range(count)]
+
+
+@pytest.mark.parametrize("batch_size, requests", [(1, 24), (4, 6)])
+def test_async_judge_against_stub_server(openai_stub, word_tokenizer, batch_size, requests):
+    evaluator = CragEvaluator("judge-model", openai.OpenAI(api_key="test", base_url=openai_stub.url), config=CONFIG)
+    queries, answers, ground_truths, contexts = judged_rows(24)
+    reported = {}
+
+    results = evaluator.evaluate(queries, answers, ground_truths, contexts, max_concurrency=4, batch_size=batch_size,
+                                 on_result=lambda row, result: reported.setdefault(row, result["query"]))
+    # Results come back in row order whatever order the calls finished in
+    assert results["query"].tolist() == queries
+    assert results["accuracy"].tolist() == [float(index % 3 != 0) for index in range(24)]
+    assert reported == dict(enumerate(queries))
+    assert len(openai_stub.requests) == requests
+    assert 1 < openai_stub.max_in_flight <= 4
+
+
+def cached_evaluator(tmp_path, replies):
+    evaluator, calls = make_evaluator(replies)
+    evaluator.verdict_cache = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    return evaluator, calls
+
+
+ITEM = {"question": "q", "ground_truth": "t", "prediction": "p"}
+
+
+def test_unparsable_verdicts_are_not_cached(tmp_path):
+    evaluator, calls = cached_evaluator(tmp_path, ["not json", '{"accuracy": "maybe"}', '{"accuracy": "true"}'])
+    assert evaluator.judge(ITEM) is None
+    assert evaluator.judge(ITEM) is None
+    assert evaluator.judge(ITEM) == 1
+    # Only the parsed verdict is served from the cache
+    assert evaluator.judge(ITEM) == 1
+    assert len(calls) == 3
+
+
+def test_batch_and_single_verdicts_are_cached_apart(tmp_path):
+    other = {"question": "q2", "ground_truth": "t2", "prediction": "p2"}
+    evaluator, calls = cached_evaluator(tmp_path, [
+        '{"verdicts": [{"id": 1, "accuracy": "false"}, {"id": 0, "accuracy": "true"}]}',
+        '{"accuracy": "false"}',
+    ])
+    assert evaluator.judge_batch([ITEM, other]) == [1, -1]
+    assert evaluator.judge_batch([ITEM, other]) == [1, -1]
+    assert len(calls) == 1
+    # The single-row prompt may judge the row differently, so it does not reuse the batch verdict
+    assert evaluator.judge(ITEM) == -1
+    assert len(calls) == 2
+
+
+def test_lone_row_judged_with_the_single_prompt_is_found_when_batching(tmp_path, word_tokenizer):
+    evaluator, calls = cached_evaluator(tmp_path, [
+        '{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": "false"}]}',
+        '{"accuracy": "true"}',
+    ])
+    queries, answers, ground_truths, contexts = judged_rows(3)
+    first = evaluator.evaluate(queries, answers, ground_truths, contexts, batch_size=2)
+    # The third row is left over and sent on its own, with the single-row prompt
+    assert len(calls) == 2
+    assert calls[1][0]["content"] == evaluator.get_system_message()
+
+    start = evaluator.verdict_cache.summary()
+    rows = [list(reversed(column)) for column in (queries, answers, ground_truths, contexts)]
+    second = evaluator.evaluate(*rows, batch_size=2)
+    assert len(calls) == 2
+    assert second["accuracy"].tolist() == list(reversed(first["accuracy"].tolist()))
+    assert evaluator.verdict_cache.summary(since=start) == {"hits": 3, "misses": 0}
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": false}, {"id": 2, "accuracy": "FALSE"}]}', [1, -1, -1]),
+    # Verdicts are matched by id, not by their position in the reply
+    ('{"verdicts": [{"id": "2", "accuracy": true}, {"id": 0, "accuracy": "false"}, {"id": 1, "accuracy": "true"}]}', [-1, 1, 1]),
+    ('{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": "true"}]}', None),
+    ('{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": "true"}, {"id": 3, "accuracy": "true"}]}', None),
+    ('{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": "true"}, {"id": 2, "accuracy": "maybe"}]}', None),
+    ('{"accuracy": "true"}', None),
+    ("not json", None),
+    (None, None),
+])
+def test_parse_batch_response(reply, expected):
+    evaluator, _ = make_evaluator([])
+    assert evaluator.parse_batch_response(reply, 3) == expected
+
+
+def test_malformed_batch_reply_falls_back_to_single_calls():
+    items = [{"question": f"q{index}", "ground_truth": "t", "prediction": "p"} for index in range(3)]
+    evaluator, calls = make_evaluator([
+        '{"verdicts": [{"id": 0, "accuracy": "true"}, {"id": 1, "accuracy": "true"}]}',
+        '{"accuracy": "true"}', '{"accuracy": "false"}', '{"accuracy": "true"}',
+    ])
+    assert evaluator.judge_batch(items) == [1, -1, 1]
+    assert len(calls) == 4
+    assert '"items"' in calls[0][1]["content"]
+    assert [call[1]["content"].startswith(f"Question: q{index}") for index, call in enumerate(calls[1:])] == [True] * 3
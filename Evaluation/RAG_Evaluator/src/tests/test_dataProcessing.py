@@ -0,0 +1,60 @@
+# src/tests/test_dataProcessing.py
+
+import numpy as np
+import pytest
+
+from utils.dataProcessing import parse_context_value, parse_contexts, trim_predictions_batch
+
+
+def words(count, width=1):
+    return [f"W{index:0{width}d}" for index in range(count)]
+
+
+def test_short_predictions_are_kept(word_tokenizer):
+    assert trim_predictions_batch(["Hello,  World!", "", 42], word_tokenizer) == ["Hello,  World!", "", "42"]
+    assert trim_predictions_batch([], word_tokenizer) == []
+
+
+def test_long_predictions_keep_their_first_tokens_verbatim(word_tokenizer):
+    prediction = "  ".join(words(100))
+    # Casing and spacing of the original text are kept, not a decoded copy of the tokens
+    assert trim_predictions_batch([prediction], word_tokenizer, max_token_length=75) == ["  ".join(words(75))]
+    assert trim_predictions_batch([prediction], word_tokenizer, max_token_length=3) == ["W0  W1  W2"]
+
+
+def test_window_with_too_few_tokens_is_tokenized_in_full(word_tokenizer):
+    # 30-character words: the 600-character window holds fewer than 75 tokens
+    prediction = "\n".join(words(100, width=30))
+    assert trim_predictions_batch([prediction, "short one"], word_tokenizer) == ["\n".join(words(75, width=30)), "short one"]
+
+
+def test_prediction_without_whitespace_in_the_window(word_tokenizer):
+    prediction = "x" * 1000 + " tail"
+    assert trim_predictions_batch([prediction], word_tokenizer, max_token_length=1) == ["x" * 1000]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ('["a", "b"]', ["a", "b"]),
+    # The repr pandas writes for a list, with quotes JSON does not accept
+    ("['a', \"b's\"]", ["a", "b's"]),
+    ("['a', 1]", ["a", "1"]),
+    ('"one context"', ["one context"]),
+    ("plain text, not a list", ["plain text, not a list"]),
+    ("__import__('os').system('echo unsafe')", ["__import__('os').system('echo unsafe')"]),
+    ("  ", []),
+    ("", []),
+    (None, []),
+    (float("nan"), []),
+    (["a", 2], ["a", "2"]),
+    (np.array(["a", "b"]), ["a", "b"]),
+    (7, ["7"]),
+])
+def test_parse_context_value(value, expected):
+    assert parse_context_value(value) == expected
+
+
+def test_parse_contexts_gives_every_row_its_own_list():
+    contexts = parse_contexts(['["a"]', '["a"]', None, ["b"]])
+    assert contexts == [["a"], ["a"], [], ["b"]]
+    contexts[0].append("changed")
+    assert contexts[1] == ["a"]
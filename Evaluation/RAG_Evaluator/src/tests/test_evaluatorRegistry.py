@@ -0,0 +1,50 @@
+# src/tests/test_evaluatorRegistry.py
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from config.configManager import freeze_config
+from evaluators import evaluatorRegistry
+from evaluators.evaluatorRegistry import get_warm_evaluators
+from routes import app as app_module
+from utils.progressTracker import ProgressTracker
+
+
+def config(model_name):
+    return {"openai": {"model_name": model_name}, "verdict_cache": {"enabled": False}}
+
+
+def test_equal_configs_share_their_evaluators(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(evaluatorRegistry, "_warm", evaluatorRegistry.OrderedDict())
+
+    first = get_warm_evaluators(freeze_config(config("judge-model")))
+    first.crag()
+    built, setup_seconds = first._crag, dict(first.setup_seconds)
+    assert set(setup_seconds) == {"crag"}
+    # An equal config from another request, parsed again, gets the evaluator already built
+    progress = ProgressTracker()
+    second = get_warm_evaluators(freeze_config(config("judge-model")))
+    assert second is first
+    assert second.crag(progress).progress is progress
+    assert (second._crag, second.setup_seconds) == (built, setup_seconds)
+    # The request still reports the (near zero) time it waited for the warm evaluator
+    assert set(progress.snapshot()["setup_seconds"]) == {"crag"}
+
+    other = get_warm_evaluators(freeze_config(config("other-model")))
+    assert other is not first
+    assert other.crag().model_name == "other-model"
+    assert other._crag is not built
+    assert evaluatorRegistry.warm_fingerprints() == [first.fingerprint, other.fingerprint]
+
+
+@pytest.mark.parametrize("ready, status_code", [(False, 503), (True, 200)])
+def test_ready_reports_the_workers(monkeypatch, ready, status_code):
+    status = {"ready": ready, "queued": 0,
+              "workers": [{"name": "job-worker-1", "state": "ready" if ready else "warming", "job_id": None,
+                           "setup_seconds": {"crag": 0.5} if ready else None, "error": None, "warm_configs": []}]}
+    monkeypatch.setattr(app_module, "job_queue", lambda: SimpleNamespace(status=lambda: status))
+    response = TestClient(app_module.app).get("/ready")
+    assert (response.status_code, response.json()) == (status_code, status)
@@ -0,0 +1,171 @@
+# src/tests/test_jobQueue.py
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from routes import app as app_module
+from services import run_eval
+from services.jobQueue import JobQueue, JobStore, run_job
+
+CONFIG = {"openai": {"model_name": "judge-model"}}
+PARAMS = {"sheet_name": "S1", "evaluate_crag": True}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs" / "jobs.sqlite"))
+    yield store
+    store.close()
+
+
+def test_state_changes_are_compare_and_set(store):
+    job = store.create("book.xlsx", "config.json", PARAMS, CONFIG)
+    assert (job["status"], job["params"], job["config"]) == ("queued", PARAMS, CONFIG)
+
+    assert store.update(job["id"], ("queued",), status="running", started_at=time.time())
+    # A second dispatcher, or a cancel that lost the race, does not move the job again
+    assert not store.update(job["id"], ("queued",), status="running")
+    assert store.update(job["id"], ("running",), status="succeeded", message="done")
+    assert not store.update(job["id"], ("running",), status="failed")
+    assert store.get(job["id"])["status"] == "succeeded"
+    assert [job["id"] for job in store.list("succeeded")] == [job["id"]]
+    assert store.list("queued") == []
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_run_job_records_the_outcome_and_progress(store, monkeypatch, fails):
+    calls = []
+
+    def run_with_params(excel_file, params, config=None, on_progress=None):
+        calls.append((excel_file, params, dict(config)))
+        on_progress({"run_id": "run-1", "output_path": "results.xlsx", "rows_done": 1})
+        print("evaluating")
+        if fails:
+            raise RuntimeError("search API is down")
+        return "All results have been saved to 'results.xlsx'."
+
+    monkeypatch.setattr(run_eval, "run_with_params", run_with_params)
+    job = store.create("book.xlsx", "config.json", PARAMS, CONFIG)
+    store.update(job["id"], ("queued",), status="running")
+
+    run_job(job["id"], store.path)
+    job = store.get(job["id"])
+    assert calls == [("book.xlsx", PARAMS, CONFIG)]
+    assert (job["run_id"], job["result_path"], job["progress"]["rows_done"]) == ("run-1", "results.xlsx", 1)
+    assert job["finished_at"] is not None
+    if fails:
+        assert (job["status"], job["error"]) == ("failed", "search API is down")
+    else:
+        assert (job["status"], job["message"]) == ("succeeded", "All results have been saved to 'results.xlsx'.")
+    # The job's output goes to its log, not to the worker's console
+    with open(store.log_path(job["id"]), encoding="utf-8") as f:
+        assert "evaluating" in f.read()
+
+
+def test_cancel_stops_queued_and_running_jobs(store):
+    queue = JobQueue(store)
+    queued = queue.submit("book.xlsx", "config.json", PARAMS, CONFIG)
+    assert queue.cancel(queued["id"])["status"] == "cancelled"
+
+    running = queue.submit("book.xlsx", "config.json", PARAMS, CONFIG)
+    store.update(running["id"], ("queued",), status="running")
+    terminated = []
+    queue._workers = [SimpleNamespace(job_id=running["id"], process=SimpleNamespace(terminate=lambda: terminated.append(1)))]
+    assert queue.cancel(running["id"])["status"] == "cancelled"
+    assert terminated == [1]
+    # A finished job keeps its state
+    assert queue.cancel(running["id"])["finished_at"] == store.get(running["id"])["finished_at"]
+
+
+def test_interrupted_jobs_are_queued_again_to_resume(store):
+    queue = JobQueue(store)
+    started = queue.submit("book.xlsx", "config.json", PARAMS, CONFIG)
+    store.update(started["id"], ("queued",), status="running", run_id="run-1")
+    not_started = queue.submit("book.xlsx", "config.json", PARAMS, CONFIG)
+    store.update(not_started["id"], ("queued",), status="running")
+
+    queue._recover()
+    assert store.get(started["id"])["status"] == "queued"
+    assert store.get(started["id"])["params"] == {**PARAMS, "resume": "run-1"}
+    assert store.get(not_started["id"])["params"] == PARAMS
+
+
+def test_worker_process_runs_queued_jobs(store, tmp_path):
+    queue = JobQueue(store, poll_seconds=0.05, warm_up=False)
+    queue.start()
+    try:
+        # The input file does not exist, so the job fails in the worker without calling any API
+        job = queue.submit(str(tmp_path / "missing.xlsx"), "config.json", {"evaluate_crag": True}, CONFIG)
+        deadline = time.monotonic() + 60
+        while store.get(job["id"])["status"] in ("queued", "running") and time.monotonic() < deadline:
+            time.sleep(0.1)
+        job = store.get(job["id"])
+        assert job["status"] == "failed"
+        assert "missing.xlsx" in job["error"]
+        assert queue.status()["ready"]
+    finally:
+        queue.shutdown()
+
+
+@pytest.fixture
+def client(store, monkeypatch, tmp_path):
+    queue = JobQueue(store)
+    monkeypatch.setattr(app_module, "job_queue", lambda: queue)
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(CONFIG))
+    excel_file = tmp_path / "book.xlsx"
+    excel_file.write_bytes(b"")
+    # Without the context manager the app's lifespan, which starts the worker processes, does not run
+    return TestClient(app_module.app), {"excel_file": str(excel_file), "config_file": str(config_file),
+                                        "params": PARAMS}
+
+
+def test_runeval_queues_a_job(client, store):
+    client, body = client
+    response = client.post("/runeval", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert store.get(job_id)["status"] == "queued"
+    assert store.get(job_id)["config"] == CONFIG
+
+    job = client.get(f"/jobs/{job_id}").json()
+    assert (job["status"], job["excel_file"]) == ("queued", body["excel_file"])
+    assert "config" not in job
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.post("/runeval", json={**body, "excel_file": "missing.xlsx"}).status_code == 400
+
+
+def test_cancel_route(client):
+    client, body = client
+    job_id = client.post("/runeval", json=body).json()["job_id"]
+    response = client.post(f"/jobs/{job_id}/cancel")
+    assert (response.status_code, response.json()["status"]) == (200, "cancelled")
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 409
+
+
+def test_result_route(client, store, tmp_path):
+    client, body = client
+    job_id = client.post("/runeval", json=body).json()["job_id"]
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+    results = tmp_path / "results.jsonl"
+    results.write_text('{"sheet": "S1", "score": 1}\n')
+    store.update(job_id, status="succeeded", result_path=str(results))
+    response = client.get(f"/jobs/{job_id}/result")
+    assert (response.status_code, response.text) == (200, results.read_text())
+
+    # A Parquet results directory is sent as a zip
+    parquet_dir = tmp_path / "results"
+    parquet_dir.mkdir()
+    (parquet_dir / "S1.parquet").write_bytes(b"PAR1")
+    store.update(job_id, result_path=str(parquet_dir))
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert response.content[:2] == b"PK"
+
+    store.update(job_id, result_path=str(tmp_path / "deleted.xlsx"))
+    assert client.get(f"/jobs/{job_id}/result").status_code == 404
@@ -0,0 +1,128 @@
+# src/tests/test_queryDedup.py
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import main
+from utils.queryDedup import QueryDeduplicator, evaluation_key, fan_out, group_rows, normalize_query
+from utils.resultWriters import OrderedRowWriter, open_result_sink
+
+
+def test_normalize_query():
+    assert normalize_query("  What's  the\tX?! ") == "what s the x"
+    assert normalize_query(None) == "none"
+
+
+def test_evaluation_key_covers_every_evaluated_text():
+    key = evaluation_key("What is X?", "Alpha", "It is alpha.", ["c1"])
+    assert evaluation_key("what is x", "alpha", "it is alpha", ["c1"]) == key
+    assert evaluation_key("what is x", "beta", "it is alpha", ["c1"]) != key
+    assert evaluation_key("what is x", "alpha", "it is beta", ["c1"]) != key
+    assert evaluation_key("what is x", "alpha", "it is alpha", ["c2"]) != key
+
+
+def test_group_rows_keeps_row_order():
+    assert group_rows([0, 1, 2, 3], ["a", "b", "a", "c"]) == {"a": [0, 2], "b": [1], "c": [3]}
+
+
+def test_fan_out_copies_the_texts_of_the_row():
+    shared = {"query": "Q?", "ground_truth": "t", "prediction": "p", "score": 1}
+    assert fan_out("crag", shared, "q", "T") == {"query": "q", "ground_truth": "T", "prediction": "p", "score": 1}
+    assert fan_out("ragas", {"user_input": "Q?", "faithfulness": 0.5}, "q", "T") == {"user_input": "q", "faithfulness": 0.5}
+    assert shared["query"] == "Q?"
+
+
+def test_run_unique_evaluates_each_key_once_per_run():
+    dedup = QueryDeduplicator()
+    texts = [("q0", "t", "a"), ("Q0!", "t", "a"), ("q1", "t", "a"), ("q2", "t", "a")]
+    keys = [normalize_query(query) for query, _, _ in texts]
+    evaluated, reported = [], {}
+
+    def evaluate_rows(rows, on_result):
+        evaluated.append(rows)
+        results = [{"query": texts[row][0], "ground_truth": "t", "prediction": "a", "score": row} for row in rows]
+        # The row searched for q2 fails and is not reported, so it is neither stored nor shared
+        for position, result in enumerate(results):
+            if texts[rows[position]][0] != "q2":
+                on_result(position, result)
+        return results
+
+    results = dedup.run_unique("crag", [0, 1, 2, 3], keys, lambda row: texts[row], evaluate_rows,
+                               on_result=lambda position, result: reported.setdefault(position, result["query"]))
+    assert evaluated == [[0, 2, 3]]
+    assert [(result["query"], result["score"]) for result in results] == [("q0", 0), ("Q0!", 0), ("q1", 2), ("q2", 3)]
+    assert reported == {0: "q0", 1: "Q0!", 2: "q1"}
+
+    # A later sheet only evaluates what no earlier call has a result for
+    results = dedup.run_unique("crag", [1, 3], keys, lambda row: texts[row], evaluate_rows)
+    assert evaluated[1:] == [[3]]
+    assert [result["query"] for result in results] == ["Q0!", "q2"]
+    assert dedup.summary() == {"crag": {"rows": 6, "evaluated": 4, "reused": 2}}
+
+
+class FakeCrag:
+    """Judges a prediction correct when it contains the ground truth."""
+
+    def __init__(self):
+        self.judged = []
+
+    def prepare_rows(self, queries, ground_truths, answers):
+        return list(zip(queries, ground_truths, answers))
+
+    def judge_prepared(self, prepared, batched=False):
+        self.judged.extend(query for query, _, _ in prepared)
+        return [{"query": query, "ground_truth": ground_truth, "prediction": answer,
+                 "score": 1 if ground_truth in answer else -1} for query, ground_truth, answer in prepared]
+
+    def evaluate(self, queries, answers, ground_truths, contexts, on_result=None, **kwargs):
+        results = self.judge_prepared(self.prepare_rows(queries, ground_truths, answers))
+        for position, result in enumerate(results):
+            on_result(position, result)
+        return pd.DataFrame(results)
+
+
+SHEET = pd.DataFrame({
+    "query": ["What is X?", "what is x", "What is X", "Other?"],
+    "ground_truth": ["alpha", "Alpha", "beta", "gamma"],
+})
+
+
+@pytest.fixture
+def searched(monkeypatch, tmp_path):
+    searches = []
+
+    def get_bot_response(api, query, ground_truth):
+        searches.append(query)
+        return {"query": query, "ground_truth": ground_truth, "context": ["c"], "context_url": "",
+                "answer": "it is alpha" if "x" in query.lower() else "it is gamma"}
+
+    def open_search_results(excel_file, sheet_name):
+        sink = open_result_sink("xlsx", str(tmp_path / sheet_name))
+        return sink, OrderedRowWriter(sink.open_sheet("Sheet1", main.SEARCH_RESULT_COLUMNS))
+
+    api = SimpleNamespace(transport=SimpleNamespace(stats=SimpleNamespace(summary=dict)))
+    crag = FakeCrag()
+    monkeypatch.setattr(main, "read_sheet", lambda excel_file, sheet_name: SHEET)
+    monkeypatch.setattr(main, "get_search_client", lambda config, mode="off": (api, get_bot_response, None))
+    monkeypatch.setattr(main, "open_search_results", open_search_results)
+    monkeypatch.setattr(main, "get_warm_evaluators", lambda config: SimpleNamespace(crag=lambda progress=None: crag))
+    return searches, crag
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_dedup_shares_verdicts_only_between_rows_with_the_same_ground_truth(searched, streaming):
+    searches, crag = searched
+    if streaming:
+        _, crag_results = main.stream_search_and_evaluate("book.xlsx", "S1", {}, run_ragas=False,
+                                                          dedup=QueryDeduplicator())
+    else:
+        _, crag_results = main.evaluate_sheet("book.xlsx", "S1", {}, run_ragas=False, use_search_api=True,
+                                              dedup=QueryDeduplicator())
+    assert sorted(searches) == ["Other?", "What is X?"]
+    # Row 1 only differs from row 0 in case, but row 2 has a different ground truth and is judged on its own
+    assert sorted(crag.judged) == ["Other?", "What is X", "What is X?"]
+    assert crag_results["query"].tolist() == SHEET["query"].tolist()
+    assert crag_results["ground_truth"].tolist() == SHEET["ground_truth"].tolist()
+    assert crag_results["score"].tolist() == [1, 1, -1, 1]
@@ -0,0 +1,33 @@
+# src/tests/test_ragasMetrics.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluators.ragasMetrics import select_ragas_metrics, summarize_ragas_results
+
+
+def test_select_ragas_metrics_keeps_report_order():
+    assert select_ragas_metrics(["answer_similarity", "faithfulness"]) == ["faithfulness", "answer_similarity"]
+    assert len(select_ragas_metrics()) == 6
+    with pytest.raises(ValueError):
+        select_ragas_metrics(["bleu"])
+
+
+def test_summary_is_the_flat_mean_of_every_metric():
+    results = pd.DataFrame({
+        "user_input": ["q0", "q1", "q2"],
+        "faithfulness": [1.0, 0.5, np.nan],
+        "answer_similarity": [0.25, 0.75, 0.5],
+        # Scores read back from the journal may come as objects, with None for rows ragas could not score
+        "context_recall": pd.Series([None, 1, 0], dtype=object),
+        "answer_relevancy": [None, None, None],
+        "total": [1, 1, 1],
+    })
+    assert summarize_ragas_results(results) == {
+        "answer_relevancy": None,
+        "faithfulness": 0.75,
+        "context_recall": 0.5,
+        "answer_similarity": 0.5,
+    }
+    assert summarize_ragas_results(pd.DataFrame([])) == {}
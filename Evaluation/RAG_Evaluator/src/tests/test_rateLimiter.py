@@ -0,0 +1,106 @@
+# src/tests/test_rateLimiter.py
+
+import time
+
+import pytest
+import requests
+
+from api.httpTransport import HttpTransport
+from utils.rateLimiter import AdaptiveRateLimiter, get_rate_limiter, parse_retry_after
+
+
+def make_limiter(**settings):
+    return AdaptiveRateLimiter(**{"rate": 1000.0, "burst": 1000, "max_concurrency": 8, "min_concurrency": 1,
+                                  "max_backoff": 60.0, **settings})
+
+
+def test_throttle_halves_concurrency_down_to_the_minimum():
+    limiter = make_limiter()
+    for expected in (4, 2, 1, 1):
+        limiter.acquire()
+        limiter.release(throttled=True, retry_after=0)
+        assert limiter.concurrency_limit == expected
+    assert limiter.throttle_count == 4
+
+
+def test_successes_raise_concurrency_by_one_per_window():
+    limiter = make_limiter()
+    limiter.concurrency_limit = 2.0
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release()
+    # Two successes at a limit of ~2 add about one request
+    assert limiter.concurrency_limit == pytest.approx(2.9)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.concurrency_limit == 8
+
+
+def test_failures_free_their_slot_without_raising_concurrency():
+    limiter = make_limiter()
+    limiter.concurrency_limit = 2.0
+    limiter.acquire()
+    limiter.release(failed=True)
+    assert (limiter.concurrency_limit, limiter.in_flight) == (2.0, 0)
+
+
+def test_transport_errors_are_not_counted_as_successes():
+    limiter = make_limiter()
+    limiter.concurrency_limit = 2.0
+    transport = HttpTransport()
+
+    def post(*args, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    transport.session.post = post
+    with pytest.raises(requests.ConnectionError):
+        transport.post_json("http://search.test/advancedSearch", {"query": "q"}, rate_limiter=limiter)
+    assert (limiter.concurrency_limit, limiter.in_flight) == (2.0, 0)
+
+
+def test_retry_after_pauses_the_endpoint():
+    limiter = make_limiter()
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0.3)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.25
+    limiter.release()
+
+
+def test_pause_is_capped_by_max_backoff():
+    limiter = make_limiter(max_backoff=0.2)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=30)
+    assert limiter.paused_until - time.monotonic() <= 0.2
+
+
+def test_concurrency_limit_blocks_until_release():
+    limiter = make_limiter(max_concurrency=1)
+    limiter.acquire()
+    assert limiter._try_acquire() is None
+    limiter.release()
+    assert limiter._try_acquire() == 0.0
+
+
+@pytest.mark.parametrize("value, expected", [("5", 5.0), ("0", 0.0), ("-3", 0.0), (None, None), ("soon", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    future = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 120))
+    assert 100 < parse_retry_after(future) <= 120
+
+
+def test_limiters_are_shared_per_endpoint_and_settings():
+    limiter = get_rate_limiter("test-endpoint", {"rate": 5.0})
+    assert get_rate_limiter("test-endpoint", {"rate": 5.0, "burst": 10}) is limiter
+    assert get_rate_limiter("other-endpoint", {"rate": 5.0}) is not limiter
+    # A config with other limits for the same endpoint gets a limiter that applies them
+    other = get_rate_limiter("test-endpoint", {"rate": 50.0})
+    assert other is not limiter
+    assert (other.rate, limiter.rate) == (50.0, 5.0)
+    assert get_rate_limiter("test-endpoint") is get_rate_limiter("test-endpoint", {})
@@ -0,0 +1,84 @@
+# src/tests/test_resultWriters.py
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from utils import resultWriters
+from utils.resultWriters import OrderedRowWriter, SheetWriter, open_result_sink
+
+COLUMNS = ["query", "context", "score"]
+ROWS = [{"query": f"q{index}", "context": [f"c{index}"], "score": index / 2} for index in range(5)]
+
+
+class ListWriter(SheetWriter):
+    def __init__(self):
+        super().__init__(COLUMNS)
+        self.appends = []
+
+    def append(self, rows):
+        self.appends.append([row["query"] for row in rows])
+
+
+def test_ordered_row_writer_writes_rows_once_the_rows_before_them_are_in():
+    writer = ListWriter()
+    rows = OrderedRowWriter(writer)
+    rows.add(1, ROWS[1])
+    rows.add(2, ROWS[2])
+    assert writer.appends == []
+    rows.add(0, ROWS[0])
+    assert writer.appends == [["q0", "q1", "q2"]]
+    rows.add(4, ROWS[4])
+    rows.add(1, ROWS[1])
+    rows.add(3, ROWS[3])
+    assert writer.appends == [["q0", "q1", "q2"], ["q3", "q4"]]
+
+
+def read_back(output_format, path):
+    if output_format == "xlsx":
+        return pd.read_excel(path, sheet_name=None)
+    if output_format == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        return {sheet: pd.DataFrame([{key: value for key, value in line.items() if key != "sheet"}
+                                     for line in lines if line["sheet"] == sheet])
+                for sheet in dict.fromkeys(line["sheet"] for line in lines)}
+    return {os.path.splitext(name)[0]: pd.read_parquet(os.path.join(path, name)) for name in sorted(os.listdir(path))}
+
+
+@pytest.mark.parametrize("output_format", ["xlsx", "jsonl", "parquet"])
+def test_sheets_can_be_streamed_or_written_whole(tmp_path, monkeypatch, output_format):
+    monkeypatch.setattr(resultWriters, "CHUNK_ROWS", 2)
+    sink = open_result_sink(output_format, str(tmp_path / "results"))
+    writer = sink.open_sheet("Streamed", COLUMNS)
+    for row in ROWS:
+        writer.append([row])
+    writer.close()
+    sink.write_sheet("Whole", pd.DataFrame(ROWS))
+    sink.close()
+
+    sheets = read_back(output_format, sink.path)
+    assert set(sheets) == {"Streamed", "Whole"}
+    for results in sheets.values():
+        assert results["query"].tolist() == [row["query"] for row in ROWS]
+        assert results["score"].tolist() == [row["score"] for row in ROWS]
+        if output_format == "xlsx":
+            # Lists are written as their text form, as DataFrame.to_excel does
+            assert results["context"].tolist() == [str(row["context"]) for row in ROWS]
+        else:
+            assert [list(context) for context in results["context"]] == [row["context"] for row in ROWS]
+
+
+def test_parquet_column_empty_in_the_first_row_group(tmp_path, monkeypatch):
+    monkeypatch.setattr(resultWriters, "CHUNK_ROWS", 2)
+    sink = open_result_sink("parquet", str(tmp_path / "results"))
+    writer = sink.open_sheet("S1", ["query", "answer"])
+    writer.append([{"query": "q0", "answer": None}, {"query": "q1", "answer": None}])
+    writer.append([{"query": "q2", "answer": "a2"}, {"query": "q3", "answer": 3}])
+    writer.close()
+
+    results = pd.read_parquet(os.path.join(sink.path, "S1.parquet"))
+    assert results["answer"].isna().tolist() == [True, True, False, False]
+    assert results["answer"].tolist()[2:] == ["a2", "3"]
@@ -0,0 +1,135 @@
+# src/tests/test_runJournal.py
+
+import pandas as pd
+import pytest
+
+import main
+from evaluators.ragasMetrics import summarize_ragas_results
+from utils.runJournal import RunJournal, completed_rows
+
+
+def test_journal_restores_recorded_rows(tmp_path):
+    journal = RunJournal("run", str(tmp_path))
+    journal.write_metadata(timestamp="20240101-000000", ragas_metrics=["faithfulness"])
+    journal.record("S1", "crag", 0, {"score": 1})
+    journal.record("S1", "crag", 2, {"score": -1})
+    journal.record("S1", "crag", 0, {"score": 0})
+    journal.close()
+
+    resumed = RunJournal.open_existing("run", str(tmp_path))
+    assert resumed.metadata == {"timestamp": "20240101-000000", "ragas_metrics": ["faithfulness"]}
+    # The last record of a row wins
+    assert resumed.completed("S1", "crag") == {0: {"score": 0}, 2: {"score": -1}}
+    assert resumed.completed("S2", "crag") == {}
+    resumed.close()
+
+
+def test_journal_skips_a_line_cut_short(tmp_path):
+    journal = RunJournal("run", str(tmp_path))
+    journal.record("S1", "search", 0, {"answer": "a"})
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"sheet": "S1", "stage": "search", "row": 1, "da')
+
+    resumed = RunJournal.open_existing("run", str(tmp_path))
+    assert resumed.completed("S1", "search") == {0: {"answer": "a"}}
+    resumed.close()
+
+
+def test_open_existing_requires_a_journal(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RunJournal.open_existing("missing", str(tmp_path))
+
+
+def test_create_new_never_reuses_a_run_id(tmp_path):
+    first = RunJournal.create_new("book_20240101", str(tmp_path))
+    second = RunJournal.create_new("book_20240101", str(tmp_path))
+    assert (first.run_id, second.run_id) == ("book_20240101", "book_20240101-2")
+    first.close()
+    second.close()
+
+
+def test_completed_rows_without_journal():
+    assert completed_rows(None, "S1", "crag") == {}
+
+
+def test_pending_rows_are_evaluated_and_restored_rows_kept(tmp_path):
+    journal = RunJournal("run", str(tmp_path))
+    journal.record("S1", "crag", 0, {"row": 0, "score": 1})
+    journal.record("S1", "crag", 2, {"row": 2, "score": 0})
+    evaluated = []
+
+    def evaluate_rows(rows, on_result):
+        evaluated.append(rows)
+        results = [{"row": row, "score": -1} for row in rows]
+        for position, result in enumerate(results):
+            on_result(position, result)
+        return pd.DataFrame(results)
+
+    results = main.evaluate_pending_rows(journal, "S1", "crag", 4, evaluate_rows)
+    assert evaluated == [[1, 3]]
+    assert results["row"].tolist() == [0, 1, 2, 3]
+    assert results["score"].tolist() == [1, -1, 0, -1]
+    # The new rows are journaled under their own row index
+    assert journal.completed("S1", "crag")[3] == {"row": 3, "score": -1}
+    journal.close()
+
+
+class FakeRagas:
+    """Scores faithfulness as the length of the answer; fails on any answer in fail_on."""
+
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.fail_on = set(fail_on)
+
+    def evaluate(self, queries, answers, ground_truths, contexts, model, metric_names=None, run_config=None):
+        self.calls.append(list(queries))
+        if self.fail_on & set(answers):
+            raise RuntimeError("ragas failed")
+        return pd.DataFrame({"user_input": queries, "response": answers, "reference": ground_truths,
+                             "faithfulness": [float(len(answer)) for answer in answers]}), None
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    rows = (["q0", "q1", "q2", "q3", "q4"], ["a", "bb", "ccc", "dddd", "eeeee"], ["t"] * 5, [[]] * 5)
+    monkeypatch.setattr(main, "load_data", lambda excel_file, sheet_name: rows)
+
+    def use(ragas):
+        warm = type("Warm", (), {"ragas": lambda self, model, progress=None: ragas})()
+        monkeypatch.setattr(main, "get_warm_evaluators", lambda config: warm)
+    return use
+
+
+def test_ragas_rows_are_journaled_per_batch(tmp_path, sheet):
+    ragas = FakeRagas(fail_on={"eeeee"})
+    sheet(ragas)
+    journal = RunJournal("run", str(tmp_path))
+    config = {"journal": {"ragas_batch_size": 2}}
+
+    with pytest.raises(RuntimeError):
+        main.evaluate_sheet("book.xlsx", "S1", config, run_crag=False, journal=journal)
+    assert ragas.calls == [["q0", "q1"], ["q2", "q3"], ["q4"]]
+    assert sorted(journal.completed("S1", "ragas")) == [0, 1, 2, 3]
+    journal.close()
+
+
+def test_resumed_summary_covers_restored_rows(tmp_path, sheet):
+    journal = RunJournal("run", str(tmp_path))
+    for row, answer in enumerate(["a", "bb", "ccc"]):
+        journal.record("S1", "ragas", row, {"user_input": f"q{row}", "response": answer, "reference": "t",
+                                            "faithfulness": float(len(answer))})
+    ragas = FakeRagas()
+    sheet(ragas)
+
+    ragas_results, _ = main.evaluate_sheet("book.xlsx", "S1", {}, run_crag=False, journal=journal)
+    assert ragas.calls == [["q3", "q4"]]
+    assert ragas_results["faithfulness"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert summarize_ragas_results(ragas_results) == {"faithfulness": 3.0}
+
+    # Nothing is left to score once every row is journaled
+    ragas.calls.clear()
+    ragas_results, _ = main.evaluate_sheet("book.xlsx", "S1", {}, run_crag=False, journal=journal)
+    assert ragas.calls == []
+    assert summarize_ragas_results(ragas_results) == {"faithfulness": 3.0}
+    journal.close()
@@ -0,0 +1,63 @@
+# src/tests/test_searchApi.py
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import main
+from utils.resultWriters import OrderedRowWriter, open_result_sink
+
+QUERIES = [f"q{index}" for index in range(8)]
+
+
+@pytest.fixture
+def search(monkeypatch, tmp_path):
+    """Search backend whose earlier rows answer last; q5 fails. Holds the largest number of calls in flight."""
+    state = {"in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def get_bot_response(api, query, ground_truth):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.01 * (len(QUERIES) - int(query[1:])))
+        with lock:
+            state["in_flight"] -= 1
+        if query == "q5":
+            return None
+        return {"query": query, "ground_truth": ground_truth, "context": [f"c{query}"], "context_url": "",
+                "answer": f"a{query}"}
+
+    def open_search_results(excel_file, sheet_name):
+        sink = open_result_sink("xlsx", str(tmp_path / sheet_name))
+        return sink, OrderedRowWriter(sink.open_sheet("Sheet1", main.SEARCH_RESULT_COLUMNS))
+
+    api = SimpleNamespace(transport=SimpleNamespace(stats=SimpleNamespace(summary=dict)))
+    monkeypatch.setattr(main, "get_search_client", lambda config, mode="off": (api, get_bot_response, None))
+    monkeypatch.setattr(main, "read_sheet", lambda excel_file, sheet_name: pd.DataFrame(
+        {"query": QUERIES, "ground_truth": [f"t{query}" for query in QUERIES]}))
+    monkeypatch.setattr(main, "open_search_results", open_search_results)
+    return state
+
+
+@pytest.mark.parametrize("search_concurrency", [1, 4])
+def test_concurrent_search_results_keep_the_input_order(search, tmp_path, search_concurrency):
+    queries, answers, ground_truths, contexts = main.load_data_and_call_api(
+        "book.xlsx", "S1", {}, search_concurrency=search_concurrency)
+
+    assert queries == QUERIES
+    assert ground_truths == [f"t{query}" for query in QUERIES]
+    expected = [f"a{query}" if query != "q5" else "Failed to get response" for query in QUERIES]
+    assert answers == expected
+    assert contexts[5] == [] and contexts[0] == ["cq0"]
+    if search_concurrency > 1:
+        assert 1 < search["max_in_flight"] <= search_concurrency
+    else:
+        assert search["max_in_flight"] == 1
+    # The saved search responses are in row order as well
+    saved = pd.read_excel(tmp_path / "S1.xlsx")
+    assert saved["query"].tolist() == QUERIES
+    assert saved["answer"].tolist() == expected
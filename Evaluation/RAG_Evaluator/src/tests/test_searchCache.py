@@ -0,0 +1,91 @@
+# src/tests/test_searchCache.py
+
+import pytest
+
+from api.searchCache import SearchCache, get_search_cache
+from utils import diskCache
+
+KEY = SearchCache.make_key("https://search.test", "app-1", "what is x", {"query": "what is x"})
+RESPONSE = {"answer": "x is y", "context": ["c1"]}
+
+
+def test_key_covers_domain_app_query_and_body():
+    assert SearchCache.make_key("https://search.test", "app-1", "what is x", {"query": "what is x"}) == KEY
+    assert SearchCache.make_key("https://other.test", "app-1", "what is x", {"query": "what is x"}) != KEY
+    assert SearchCache.make_key("https://search.test", "app-2", "what is x", {"query": "what is x"}) != KEY
+    assert SearchCache.make_key("https://search.test", "app-1", "what is z", {"query": "what is x"}) != KEY
+    assert SearchCache.make_key("https://search.test", "app-1", "what is x", {"query": "what is x", "top": 5}) != KEY
+
+
+def test_readwrite_serves_stored_responses(tmp_path):
+    cache = SearchCache("readwrite", path=str(tmp_path / "search.sqlite"))
+    assert cache.get(KEY) is None
+    cache.set(KEY, RESPONSE)
+    assert cache.get(KEY) == RESPONSE
+    assert cache.summary() == {"mode": "readwrite", "hits": 1, "misses": 1}
+
+
+def test_refresh_overwrites_and_readonly_never_stores(tmp_path):
+    path = str(tmp_path / "search.sqlite")
+    SearchCache("readwrite", path=path).set(KEY, {"answer": "old"})
+
+    refresh = SearchCache("refresh", path=path)
+    # refresh always calls the API, then replaces the stored response
+    assert refresh.get(KEY) is None
+    refresh.set(KEY, RESPONSE)
+
+    readonly = SearchCache("readonly", path=path)
+    assert readonly.get(KEY) == RESPONSE
+    other = SearchCache.make_key("https://search.test", "app-1", "other", {})
+    readonly.set(other, RESPONSE)
+    assert readonly.get(other) is None
+    assert readonly.summary() == {"mode": "readonly", "hits": 1, "misses": 1}
+
+
+def test_off_bypasses_the_cache(tmp_path):
+    cache = SearchCache("off", path=str(tmp_path / "search.sqlite"))
+    cache.set(KEY, RESPONSE)
+    assert cache.get(KEY) is None
+    assert not (tmp_path / "search.sqlite").exists()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SearchCache("sometimes")
+
+
+def test_responses_expire_after_the_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(diskCache.time, "time", lambda: now[0])
+    cache = SearchCache("readwrite", path=str(tmp_path / "search.sqlite"), ttl_hours=1)
+    cache.set(KEY, RESPONSE)
+    now[0] += 3599
+    assert cache.get(KEY) == RESPONSE
+    now[0] += 2
+    assert cache.get(KEY) is None
+    assert cache.summary()["misses"] == 1
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(diskCache.time, "time", lambda: now[0])
+    monkeypatch.setattr(diskCache.DiskCache, "_EVICTION_INTERVAL", 1)
+    cache = SearchCache("readwrite", path=str(tmp_path / "search.sqlite"), max_entries=2)
+    keys = [SearchCache.make_key("https://search.test", "app-1", f"q{index}", {}) for index in range(3)]
+    for key in keys[:2]:
+        now[0] += 1
+        cache.set(key, RESPONSE)
+    # Reading q0 makes q1 the least recently used response
+    now[0] += 1
+    assert cache.get(keys[0]) == RESPONSE
+    now[0] += 1
+    cache.set(keys[2], RESPONSE)
+    assert [cache.get(key) is not None for key in keys] == [True, False, True]
+
+
+def test_caches_are_shared_per_mode_and_settings(tmp_path):
+    settings = {"path": str(tmp_path / "search.sqlite")}
+    cache = get_search_cache("readwrite", settings)
+    assert get_search_cache("readwrite", dict(settings)) is cache
+    assert get_search_cache("readonly", settings) is not cache
+    assert get_search_cache("readwrite", {**settings, "ttl_hours": 1}) is not cache
@@ -0,0 +1,71 @@
+# src/tests/test_workbookLoader.py
+
+import os
+
+import pandas as pd
+import pytest
+
+from utils import workbookLoader
+from utils.workbookLoader import clear_workbooks, read_workbook
+
+
+def write_book(path, rows):
+    pd.DataFrame({"query": [f"q{index}" for index in range(rows)], "contexts": ['["c"]'] * rows}) \
+        .to_excel(path, sheet_name="S1", index=False)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def empty_memory():
+    clear_workbooks()
+    yield
+    clear_workbooks()
+
+
+def test_memory_keeps_the_most_recent_workbooks_that_fit(tmp_path, monkeypatch):
+    books = [write_book(tmp_path / f"book{index}.xlsx", 50 + index) for index in range(3)]
+    cache_dir = str(tmp_path / "cache")
+    size = workbookLoader._workbook_size(read_workbook(books[0], cache_dir))
+    clear_workbooks()
+    monkeypatch.setattr(workbookLoader, "MAX_WORKBOOK_MEMORY_BYTES", int(size * 2.5))
+
+    for book in books:
+        read_workbook(book, cache_dir)
+    assert len(workbookLoader._workbooks) == 2
+    # A workbook larger than the limit is still kept while it is the newest
+    monkeypatch.setattr(workbookLoader, "MAX_WORKBOOK_MEMORY_BYTES", 1)
+    sheets = read_workbook(books[0], cache_dir)
+    assert [entry[0] for entry in workbookLoader._workbooks.values()] == [sheets]
+
+    clear_workbooks()
+    assert len(workbookLoader._workbooks) == 0
+    assert read_workbook(books[0], cache_dir)["S1"]["contexts"].tolist()[0] == ["c"]
+
+
+def test_disk_cache_drops_the_least_recently_used_entries(tmp_path, monkeypatch):
+    books = [write_book(tmp_path / f"book{index}.xlsx", 50 + index) for index in range(3)]
+    cache_dir = tmp_path / "cache"
+    read_workbook(books[0], str(cache_dir))
+    entry_size = sum(entry.stat().st_size for entry in next(cache_dir.iterdir()).iterdir())
+    monkeypatch.setattr(workbookLoader, "MAX_WORKBOOK_CACHE_BYTES", int(entry_size * 2.5))
+
+    read_workbook(books[1], str(cache_dir))
+    # Reading book0 from the disk cache again makes book1 the least recently used entry
+    clear_workbooks()
+    for age, book in enumerate(books[:2]):
+        os.utime(os.path.join(cache_dir, workbookLoader.file_hash(book), "manifest.json"), (age, age))
+    read_workbook(books[0], str(cache_dir))
+    read_workbook(books[2], str(cache_dir))
+
+    cached = {entry.name for entry in cache_dir.iterdir()}
+    assert cached == {workbookLoader.file_hash(books[0]), workbookLoader.file_hash(books[2])}
+
+
+def test_removed_cache_entry_is_parsed_again(tmp_path):
+    book = write_book(tmp_path / "book.xlsx", 3)
+    cache_dir = tmp_path / "cache"
+    read_workbook(book, str(cache_dir))
+    clear_workbooks()
+    os.remove(os.path.join(cache_dir, workbookLoader.file_hash(book), "0.parquet"))
+
+    assert read_workbook(book, str(cache_dir))["S1"]["query"].tolist() == ["q0", "q1", "q2"]
@@ -0,0 +1,18 @@
+# src/utils/asyncUtils.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_coroutine_sync(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code. When the caller is
+    already inside an event loop (e.g. the FastAPI handlers), the coroutine runs
+    on a fresh loop in a helper thread, since asyncio.run cannot be nested.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -1,8 +1,26 @@
 
 # src/utils/dataProcessing.py
 
+import ast
 import json
-from loguru import logger
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_tokenizers = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(name="bert-base-uncased"):
+    """Loads the fast tokenizer on first use and shares it across the process."""
+    with _tokenizers_lock:
+        if name not in _tokenizers:
+            from transformers import AutoTokenizer
+            _tokenizers[name] = AutoTokenizer.from_pretrained(name, use_fast=True)
+        return _tokenizers[name]
 
 
 def trim_predictions_to_max_token_length(prediction, tokenizer, max_token_length=75):
@@ -11,3 +29,76 @@ def trim_predictions_to_max_token_length(prediction, tokenizer, max_token_length
     return tokenizer.decode(trimmed_tokenized_prediction)
 
 
+def trim_predictions_batch(predictions, tokenizer, max_token_length=75, window_chars_per_token=8):
+    """
+    Trims every prediction to its first max_token_length tokens with a single tokenizer call.
+    The offset mapping of the last kept token gives the cut point, so the original text
+    (casing, spacing) is kept instead of a decoded copy of the tokens.
+    """
+    predictions = [str(prediction) for prediction in predictions]
+    if not predictions:
+        return []
+
+    def encode_offsets(texts):
+        return tokenizer(texts, add_special_tokens=False, truncation=True,
+                         max_length=max_token_length, return_offsets_mapping=True)["offset_mapping"]
+
+    # Only the head of a long prediction can survive the trim, so tokenize a window cut at a
+    # whitespace boundary (tokens never span whitespace); rows whose window turns out to hold
+    # fewer than max_token_length tokens are tokenized again in full.
+    window = max_token_length * window_chars_per_token
+    heads = []
+    for prediction in predictions:
+        cut = max(prediction.rfind(separator, 0, window) for separator in (" ", "\n", "\t")) \
+            if len(prediction) > window else -1
+        heads.append(prediction[:cut] if cut > 0 else prediction)
+    offset_mapping = encode_offsets(heads)
+
+    redo = [index for index, (prediction, head, offsets) in enumerate(zip(predictions, heads, offset_mapping))
+            if len(head) < len(prediction) and len(offsets) < max_token_length]
+    if redo:
+        for index, offsets in zip(redo, encode_offsets([predictions[index] for index in redo])):
+            offset_mapping[index] = offsets
+
+    return [
+        prediction[:offsets[-1][1]] if offsets else ""
+        for prediction, offsets in zip(predictions, offset_mapping)
+    ]
+
+def parse_context_value(value):
+    """
+    Turns one contexts cell into a list of strings without eval: already parsed lists pass
+    through, JSON is tried first, then Python literals (the repr pandas writes for a list).
+    Text that is neither is kept as a single context.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    if not isinstance(value, str):
+        return [str(item) for item in value] if hasattr(value, "__iter__") else [str(value)]
+    text = value.strip()
+    if not text:
+        return []
+    try:
+        parsed = orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(text)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return [value]
+    if isinstance(parsed, (list, tuple)):
+        return [str(item) for item in parsed]
+    return [str(parsed)]
+
+
+def parse_contexts(values):
+    """Parses a contexts column; each distinct cell is parsed once and every row gets its own list."""
+    parsed = {}
+
+    def parse(value):
+        if not isinstance(value, str):
+            return parse_context_value(value)
+        if value not in parsed:
+            parsed[value] = parse_context_value(value)
+        return list(parsed[value])
+
+    return [parse(value) for value in values]
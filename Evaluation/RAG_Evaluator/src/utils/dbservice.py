@@ -1,14 +1,12 @@
 from pymongo import MongoClient
 import numpy as np
-from config.configManager import ConfigManager
+from config.configManager import resolve_config
 from datetime import datetime
 
-config_manager = ConfigManager()
-config = config_manager.get_config()
 
 
-
-def dbService(df, result, timestamp):
+def dbService(df, result, timestamp, config=None):
+    config = resolve_config(config)
     # MongoDB connection setup
     client = MongoClient(config["MongoDB"]["url"])
     db = client[config["MongoDB"]["dbName"]]
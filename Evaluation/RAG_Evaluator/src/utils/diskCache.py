@@ -0,0 +1,94 @@
+# src/utils/diskCache.py
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class DiskCache:
+    """
+    Small SQLite key/value store with a time-to-live and least-recently-used
+    eviction once the table grows past max_entries. Values are raw bytes;
+    callers choose the encoding.
+    """
+
+    _EVICTION_INTERVAL = 100
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 readonly: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _is_fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is None or now - created_at <= self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Looks up many keys with one query per 500 keys; expired and missing keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({key: value for key, value, created_at in rows if self._is_fresh(created_at, now)})
+            if found and not self.readonly:
+                with self._conn:
+                    self._conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?",
+                                           [(now, key) for key in found])
+        return found
+
+    def set(self, key: str, value: bytes):
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, bytes]):
+        if self.readonly or not items:
+            return
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, now, now) for key, value in items.items()]
+                )
+            self._writes_since_eviction += len(items)
+            if self._writes_since_eviction >= self._EVICTION_INTERVAL:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        self._writes_since_eviction = 0
+        with self._conn:
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries is not None:
+                count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
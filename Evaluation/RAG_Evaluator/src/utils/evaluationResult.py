@@ -28,19 +28,39 @@ class ResultsConverter:
     def get_ragas_results(self):
         return self.ragas_results
 
-    def get_combined_results(self):
-        """Combines the converted Ragas results and CRAG results DataFrames."""
-        # Assuming both DataFrames have the same number of rows
-        if len(self.ragas_results) != len(self.crag_results):
-            print("Warning: Ragas and CRAG results have different row counts. Combining may lead to misalignment.")
-
-        # Combine the DataFrames
-        combined_results = pd.concat([self.ragas_results.reset_index(drop=True), self.crag_results.reset_index(drop=True)], axis=1)
+    @staticmethod
+    def _row_keys(results: pd.DataFrame, query_column: str) -> pd.Series:
+        """Query text plus its occurrence number, so repeated queries still pair up one to one."""
+        queries = results[query_column].astype(str).str.strip()
+        return queries + "\x1f" + queries.groupby(queries).cumcount().astype(str)
 
-        # Remove duplicate columns while keeping the first occurrence
-        combined_results = combined_results.loc[:, ~combined_results.columns.duplicated()]
-
-        return combined_results
+    def get_combined_results(self):
+        """Combines the converted Ragas results and CRAG results DataFrames, matching rows by query."""
+        ragas_results = self.ragas_results.reset_index(drop=True)
+        crag_results = self.crag_results.reset_index(drop=True)
+        ragas_query_column = next((column for column in ('query', 'user_input') if column in ragas_results.columns), None)
+
+        if ragas_query_column is None or 'query' not in crag_results.columns:
+            # Without a query column on both sides fall back to pairing rows by position
+            if len(ragas_results) != len(crag_results):
+                print("Warning: Ragas and CRAG results have different row counts. Combining may lead to misalignment.")
+            combined_results = pd.concat([ragas_results, crag_results], axis=1)
+            # Remove duplicate columns while keeping the first occurrence
+            return combined_results.loc[:, ~combined_results.columns.duplicated()]
+
+        # Columns present on both sides are taken from the Ragas results
+        crag_columns = [column for column in crag_results.columns if column not in ragas_results.columns]
+        combined_results = ragas_results.assign(_row_key=self._row_keys(ragas_results, ragas_query_column),
+                                                _position=range(len(ragas_results))).merge(
+            crag_results[crag_columns].assign(_row_key=self._row_keys(crag_results, 'query')),
+            on='_row_key', how='outer', sort=False, indicator=True
+        )
+        unmatched = (combined_results['_merge'] != 'both').sum()
+        if unmatched:
+            print(f"Warning: {unmatched} rows are only present in the Ragas or the CRAG results.")
+        # Keep the input row order; rows only CRAG has go last
+        combined_results = combined_results.sort_values('_position', kind='stable', na_position='last')
+        return combined_results.drop(columns=['_row_key', '_position', '_merge']).reset_index(drop=True)
 
 
 # Example usage:
@@ -16,9 +16,6 @@ def load_json_file(file_path):
     try:
         with open(file_path, 'r') as file:
             data = json.load(file)
-
-        # Now you can work with the data
-        print(data)
         return data
     except FileNotFoundError:
         # print(f"The file {file_path} was not found in {os.path.join(current_dir, relative_path)}")
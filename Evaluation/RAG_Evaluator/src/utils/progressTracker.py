@@ -0,0 +1,128 @@
+# src/utils/progressTracker.py
+
+import math
+import threading
+import time
+from numbers import Number
+from typing import Callable, Dict, Iterable, Optional
+
+from tqdm.auto import tqdm
+
+
+class ProgressTracker:
+    """
+    Live progress of one run: rows done per stage, running means of their numeric results,
+    throughput, ETA, token spend and the time spent setting up evaluators. on_update(snapshot)
+    is called at most every min_interval seconds while rows complete, and whenever
+    emit(force=True) is called.
+    """
+
+    def __init__(self, on_update: Optional[Callable[[Dict], None]] = None, min_interval: float = 0.5,
+                 cost_per_input_token: float = 0.0, cost_per_output_token: float = 0.0, **fields):
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self.cost_per_input_token = cost_per_input_token or 0.0
+        self.cost_per_output_token = cost_per_output_token or 0.0
+        self.fields = dict(fields)
+        self.started_at = time.time()
+        self._stages = {}
+        self._tokens = {}
+        self._setup = {}
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def _stage(self, stage: str) -> Dict:
+        return self._stages.setdefault(stage, {"total": 0, "done": 0, "first_done_at": None, "sums": {}, "counts": {}})
+
+    def update_fields(self, **fields):
+        with self._lock:
+            self.fields.update(fields)
+
+    def add_total(self, stage: str, rows: int):
+        with self._lock:
+            self._stage(stage)["total"] += rows
+        self.emit()
+
+    def rows_done(self, stage: str, results: Iterable = (), rows: Optional[int] = None):
+        """Counts finished rows; dict results also feed the running means of their numeric fields."""
+        results = list(results)
+        with self._lock:
+            state = self._stage(stage)
+            if state["first_done_at"] is None:
+                state["first_done_at"] = time.time()
+            state["done"] += len(results) if rows is None else rows
+            for result in results:
+                if not isinstance(result, dict):
+                    continue
+                for key, value in result.items():
+                    if isinstance(value, Number) and not isinstance(value, bool) and not math.isnan(value):
+                        state["sums"][key] = state["sums"].get(key, 0.0) + float(value)
+                        state["counts"][key] = state["counts"].get(key, 0) + 1
+        self.emit()
+
+    def add_tokens(self, stage: str, input_tokens: int = 0, output_tokens: int = 0):
+        with self._lock:
+            tokens = self._tokens.setdefault(stage, {"input": 0, "output": 0})
+            tokens["input"] += input_tokens or 0
+            tokens["output"] += output_tokens or 0
+
+    def add_setup(self, component: str, seconds: float):
+        """Adds time spent building (or fetching already warm) evaluators before they could be used."""
+        with self._lock:
+            self._setup[component] = self._setup.get(component, 0.0) + seconds
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            stages = {}
+            for stage, state in self._stages.items():
+                # Throughput is measured from the stage's first finished row, so queueing time does not count
+                elapsed = now - state["first_done_at"] if state["first_done_at"] is not None else 0.0
+                rate = state["done"] / elapsed if elapsed > 0 else None
+                remaining = max(state["total"] - state["done"], 0)
+                stages[stage] = {
+                    "total": state["total"],
+                    "done": state["done"],
+                    "rows_per_second": round(rate, 3) if rate else None,
+                    "eta_seconds": round(remaining / rate, 1) if rate else (0.0 if not remaining else None),
+                    "metrics": {key: round(state["sums"][key] / state["counts"][key], 4) for key in state["sums"]},
+                }
+            input_tokens = sum(tokens["input"] for tokens in self._tokens.values())
+            output_tokens = sum(tokens["output"] for tokens in self._tokens.values())
+            etas = [stage["eta_seconds"] for stage in stages.values()]
+            return {
+                **self.fields,
+                "elapsed_seconds": round(now - self.started_at, 1),
+                "eta_seconds": None if None in etas else max(etas, default=0.0),
+                "stages": stages,
+                "tokens": {"input": input_tokens, "output": output_tokens,
+                           "by_stage": {stage: dict(tokens) for stage, tokens in self._tokens.items()}},
+                "cost": round(input_tokens * self.cost_per_input_token + output_tokens * self.cost_per_output_token, 6),
+                "setup_seconds": {component: round(seconds, 3) for component, seconds in self._setup.items()},
+            }
+
+    def emit(self, force: bool = False):
+        if self.on_update is None:
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+        self.on_update(self.snapshot())
+
+
+class TrackedProgressBar(tqdm):
+    """tqdm bar that also reports its total and every finished row to a ProgressTracker."""
+
+    def __init__(self, *args, tracker: Optional[ProgressTracker] = None, stage: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tracker = tracker
+        self.stage = stage
+        if tracker is not None:
+            tracker.add_total(stage, self.total or 0)
+
+    def update_rows(self, results):
+        self.update(len(results))
+        if self.tracker is not None:
+            self.tracker.rows_done(self.stage, results)
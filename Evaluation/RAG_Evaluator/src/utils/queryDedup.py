@@ -0,0 +1,108 @@
+# src/utils/queryDedup.py
+
+import json
+import threading
+import unicodedata
+from typing import Dict, Hashable, List, Sequence
+
+# Per stage, the result fields holding the query, ground truth and answer of the row
+ROW_TEXT_FIELDS = {
+    "search": ("query", "ground_truth", "answer"),
+    "crag": ("query", "ground_truth", "prediction"),
+    "ragas": ("user_input", "reference", "response"),
+}
+
+
+def normalize_query(text) -> str:
+    """Lowercases, replaces punctuation with spaces and collapses whitespace."""
+    text = "".join(" " if unicodedata.category(char).startswith("P") else char for char in str(text).lower())
+    return " ".join(text.split())
+
+
+def evaluation_key(query, ground_truth, answer, contexts) -> str:
+    """Rows with the same key get the same CRAG verdict and Ragas scores."""
+    return json.dumps([normalize_query(query), normalize_query(ground_truth), normalize_query(answer),
+                       [str(context) for context in contexts or []]], ensure_ascii=False)
+
+
+def group_rows(rows: Sequence[int], keys: Sequence[Hashable]) -> Dict[Hashable, List[int]]:
+    """Groups rows by keys[row], in row order; the first row of each group stands in for the others."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(keys[row], []).append(row)
+    return groups
+
+
+def fan_out(stage: str, result: Dict, query, ground_truth, answer=None) -> Dict:
+    """Copy of a shared result that carries the texts of the row it is handed to."""
+    texts = zip(ROW_TEXT_FIELDS[stage], (query, ground_truth, answer))
+    return {**result, **{field: text for field, text in texts if text is not None and field in result}}
+
+
+class QueryDeduplicator:
+    """
+    Run-wide memo of search responses and evaluation results by normalized key. One instance is
+    shared by every sheet of a run, so a query repeated within a sheet or across sheets is
+    searched and judged once. Only successful results are stored; failed rows are tried again.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, stage: str, keys) -> Dict[Hashable, Dict]:
+        with self._lock:
+            return {key: self._results[(stage, key)] for key in keys if (stage, key) in self._results}
+
+    def set(self, stage: str, key: Hashable, result: Dict):
+        with self._lock:
+            self._results[(stage, key)] = result
+
+    def count(self, stage: str, rows: int, evaluated: int):
+        with self._lock:
+            counts = self._counts.setdefault(stage, {"rows": 0, "evaluated": 0})
+            counts["rows"] += rows
+            counts["evaluated"] += evaluated
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {stage: {**counts, "reused": counts["rows"] - counts["evaluated"]}
+                    for stage, counts in self._counts.items()}
+
+    def run_unique(self, stage: str, rows: List[int], keys: Sequence[Hashable], row_texts, evaluate_rows,
+                   on_result=None) -> List[Dict]:
+        """
+        Calls evaluate_rows(unique_rows, on_unique_result) with the first row of every key that no
+        earlier call has a result for, and returns one result per row in rows. row_texts(row) gives
+        the (query, ground_truth, answer) copied into the shared results. on_result(position,
+        row_result) is called for every row that gets a successful result.
+        """
+        groups = group_rows(range(len(rows)), [keys[row] for row in rows])
+        known = self.get_many(stage, groups)
+        unique = [positions[0] for key, positions in groups.items() if key not in known]
+        self.count(stage, len(rows), len(unique))
+        results = {}
+
+        def share(key, result, notify=True):
+            for position in groups[key]:
+                results[position] = fan_out(stage, result, *row_texts(rows[position]))
+                if notify and on_result:
+                    on_result(position, results[position])
+
+        for key, result in known.items():
+            share(key, result)
+
+        def on_unique_result(index, result):
+            key = keys[rows[unique[index]]]
+            self.set(stage, key, result)
+            share(key, result)
+
+        if unique:
+            unique_results = evaluate_rows([rows[position] for position in unique], on_unique_result)
+            records = unique_results.to_dict(orient="records") if hasattr(unique_results, "to_dict") else unique_results
+            for position, result in zip(unique, records):
+                # Rows the evaluator did not report as done (failed searches) are not stored or journaled
+                if position not in results:
+                    share(keys[rows[position]], result, notify=False)
+        return [results[position] for position in range(len(rows))]
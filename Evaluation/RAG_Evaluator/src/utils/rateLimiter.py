@@ -0,0 +1,133 @@
+# src/utils/rateLimiter.py
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Status codes that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUS_CODES = (429, 503)
+
+DEFAULT_RATE_LIMIT_SETTINGS = {
+    "rate": 10.0,
+    "burst": 10,
+    "max_concurrency": 16,
+    "min_concurrency": 1,
+    "max_backoff": 60.0
+}
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket limiting the request rate, combined with an AIMD limit on the
+    number of requests in flight. Throttled responses halve the concurrency
+    limit and pause the endpoint (for Retry-After when given, otherwise an
+    exponential backoff); every success raises the limit again by one request
+    per window. Failed requests (errors, timeouts) only free their slot.
+    """
+
+    def __init__(self, rate=10.0, burst=10, max_concurrency=16, min_concurrency=1, max_backoff=60.0):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_backoff = max_backoff
+        self.concurrency_limit = float(max_concurrency)
+        self.tokens = self.capacity
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttle_count = 0
+        self._consecutive_throttles = 0
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _try_acquire(self) -> Optional[float]:
+        """Takes a slot if one is free; otherwise returns how long to wait (None: until a release)."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.concurrency_limit):
+            return None
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    return
+                self._condition.wait(wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait if wait is not None else 0.05)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for retries that carry no Retry-After hint."""
+        return min(self.max_backoff, (2 ** attempt) * (0.5 + random.random() / 2))
+
+    def release(self, throttled=False, retry_after: Optional[float] = None, failed=False):
+        """Frees a slot; throttled backs off, failed leaves the limit as is and anything else counts as a success."""
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if throttled:
+                self.throttle_count += 1
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+                delay = retry_after if retry_after is not None else self.backoff_delay(self._consecutive_throttles)
+                self._consecutive_throttles += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + min(delay, self.max_backoff))
+            elif not failed:
+                self._consecutive_throttles = 0
+                self.concurrency_limit = min(float(self.max_concurrency),
+                                             self.concurrency_limit + 1 / self.concurrency_limit)
+            self._condition.notify_all()
+
+
+_limiters: Dict[tuple, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, settings: Optional[Dict] = None) -> AdaptiveRateLimiter:
+    """
+    Returns the limiter shared by every caller of the named endpoint with the same settings, creating it
+    on first use. Runs whose configs set different limits for an endpoint each get their own limiter.
+    """
+    settings = {**DEFAULT_RATE_LIMIT_SETTINGS, **(settings or {})}
+    key = (name, tuple(sorted(settings.items())))
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = AdaptiveRateLimiter(**settings)
+        return _limiters[key]
@@ -0,0 +1,254 @@
+# src/utils/resultWriters.py
+
+import json
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+from openpyxl import Workbook
+
+RESULT_FORMATS = ("xlsx", "jsonl", "parquet")
+
+# Rows converted and written per step, so only one chunk of a sheet is ever held twice in memory
+CHUNK_ROWS = 5000
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _json_value(value):
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _excel_value(value):
+    # Lists (contexts) are written as their text form, like DataFrame.to_excel does; NaN leaves the cell empty
+    if hasattr(value, "tolist") and not isinstance(value, (int, float)):
+        value = value.tolist()
+    if isinstance(value, (list, tuple, dict, set)):
+        return str(value)
+    return None if _is_missing(value) else value
+
+
+def _chunks(results: pd.DataFrame):
+    for start in range(0, len(results), CHUNK_ROWS):
+        yield results.iloc[start:start + CHUNK_ROWS]
+
+
+def _as_text(results: pd.DataFrame) -> pd.DataFrame:
+    # Columns mixing text and numbers are written as text
+    return results.apply(lambda column: column.map(lambda value: value if _is_missing(value) or
+                                                   hasattr(value, "__len__") else str(value))
+                         if column.dtype == object else column)
+
+
+class SheetWriter(ABC):
+    """The rows of one sheet, appended as lists of {column: value} dicts in the order they are to be written."""
+
+    def __init__(self, columns):
+        self.columns = [str(column) for column in columns]
+
+    @abstractmethod
+    def append(self, rows):
+        pass
+
+    def close(self):
+        pass
+
+
+class ResultSink(ABC):
+    """Output file of a run. open_sheet streams a sheet row by row; write_sheet writes a finished sheet."""
+
+    @abstractmethod
+    def open_sheet(self, sheet_name: str, columns) -> SheetWriter:
+        pass
+
+    def write_sheet(self, sheet_name: str, results: pd.DataFrame):
+        results = results.rename(columns=str)
+        writer = self.open_sheet(sheet_name, results.columns)
+        for chunk in _chunks(results):
+            writer.append(chunk.to_dict(orient="records"))
+        writer.close()
+
+    def close(self):
+        pass
+
+
+class XlsxSheetWriter(SheetWriter):
+    def __init__(self, worksheet, columns):
+        super().__init__(columns)
+        self._worksheet = worksheet
+        self._worksheet.append(self.columns)
+
+    def append(self, rows):
+        for row in rows:
+            self._worksheet.append([_excel_value(row.get(column)) for column in self.columns])
+
+
+class XlsxResultSink(ResultSink):
+    """One worksheet per sheet in an openpyxl write-only workbook; rows are streamed to disk as they are added."""
+
+    extension = ".xlsx"
+
+    def __init__(self, path_base: str):
+        self.path = path_base + self.extension
+        self._workbook = Workbook(write_only=True)
+
+    def open_sheet(self, sheet_name: str, columns) -> SheetWriter:
+        return XlsxSheetWriter(self._workbook.create_sheet(title=sheet_name), columns)
+
+    def close(self):
+        self._workbook.save(self.path)
+
+
+class JsonlSheetWriter(SheetWriter):
+    def __init__(self, file, sheet_name, columns):
+        super().__init__(columns)
+        self._file = file
+        self._sheet_name = sheet_name
+
+    def append(self, rows):
+        if not rows:
+            return
+        lines = [json.dumps({"sheet": self._sheet_name, **{column: _json_value(row.get(column)) for column in self.columns}},
+                            ensure_ascii=False, default=str)
+                 for row in rows]
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+
+
+class JsonlResultSink(ResultSink):
+    """A single JSON Lines file; every row carries the name of its sheet."""
+
+    extension = ".jsonl"
+
+    def __init__(self, path_base: str):
+        self.path = path_base + self.extension
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def open_sheet(self, sheet_name: str, columns) -> SheetWriter:
+        return JsonlSheetWriter(self._file, sheet_name, columns)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSheetWriter(SheetWriter):
+    """
+    Buffers appended rows and writes them one row group of CHUNK_ROWS at a time. Without a schema, the
+    first row group sets it; columns that are still empty in it are taken to be text.
+    """
+
+    def __init__(self, path, columns, schema=None):
+        super().__init__(columns)
+        self.path = path
+        self._schema = schema
+        self._writer = None
+        self._rows = []
+
+    def append(self, rows):
+        self._rows.extend(rows)
+        if len(self._rows) >= CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self):
+        # pyarrow is only needed, and imported, for Parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows and self._writer is not None:
+            return
+        chunk = pd.DataFrame(self._rows, columns=self.columns)
+        self._rows = []
+        if self._schema is None:
+            try:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                chunk = _as_text(chunk)
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            self._schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                      for field in schema], metadata=schema.metadata)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        try:
+            table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = pa.Table.from_pandas(_as_text(chunk), schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+class ParquetResultSink(ResultSink):
+    """A directory with one Parquet file per sheet, written one row group per chunk of rows."""
+
+    extension = ""
+
+    def __init__(self, path_base: str):
+        self.path = path_base
+        os.makedirs(self.path, exist_ok=True)
+
+    def open_sheet(self, sheet_name: str, columns, schema=None) -> SheetWriter:
+        return ParquetSheetWriter(os.path.join(self.path, f"{sheet_name}.parquet"), columns, schema=schema)
+
+    def write_sheet(self, sheet_name: str, results: pd.DataFrame):
+        import pyarrow as pa
+
+        results = results.rename(columns=str)
+        # Inferred from the whole sheet, so a column that is empty in the first chunk still gets its real type
+        try:
+            schema = pa.Schema.from_pandas(results, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            results = _as_text(results)
+            schema = pa.Schema.from_pandas(results, preserve_index=False)
+        writer = self.open_sheet(sheet_name, results.columns, schema=schema)
+        for chunk in _chunks(results):
+            writer.append(chunk.to_dict(orient="records"))
+        writer.close()
+
+
+class OrderedRowWriter:
+    """
+    Appends rows that finish in any order to a SheetWriter in row order: a row is written as soon as
+    every row before it has been, so only the rows that finished early are held back.
+    """
+
+    def __init__(self, sheet_writer: SheetWriter):
+        self.sheet_writer = sheet_writer
+        self._waiting = {}
+        self._next_row = 0
+        self._lock = threading.Lock()
+
+    def add(self, row: int, values: dict):
+        with self._lock:
+            if row < self._next_row:
+                return
+            self._waiting[row] = values
+            ready = []
+            while self._next_row in self._waiting:
+                ready.append(self._waiting.pop(self._next_row))
+                self._next_row += 1
+            if ready:
+                self.sheet_writer.append(ready)
+
+
+_SINKS = {
+    "xlsx": XlsxResultSink,
+    "jsonl": JsonlResultSink,
+    "parquet": ParquetResultSink,
+}
+
+
+def open_result_sink(output_format: str, path_base: str):
+    """Returns the sink for output_format; path_base is the output path without an extension."""
+    if output_format not in _SINKS:
+        raise ValueError(f"Unknown output format '{output_format}'; choose from {list(RESULT_FORMATS)}")
+    return _SINKS[output_format](path_base)
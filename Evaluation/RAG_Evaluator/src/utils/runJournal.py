@@ -0,0 +1,100 @@
+# src/utils/runJournal.py
+
+import itertools
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "runs")
+
+DEFAULT_JOURNAL_SETTINGS = {
+    # Rows per Ragas call outside --streaming; each batch is journaled as soon as it is scored
+    "ragas_batch_size": 64
+}
+
+
+def _to_jsonable(value):
+    # numpy arrays/scalars and pandas values that json cannot serialise natively
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of an evaluation run. Every search response and
+    every CRAG/Ragas row result is written as soon as it is available, so an
+    interrupted run can be resumed and only the missing rows re-evaluated.
+    """
+
+    def __init__(self, run_id: str, journal_dir: str = JOURNAL_DIR):
+        self.run_id = run_id
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.join(journal_dir, f"{run_id}.jsonl")
+        self.metadata = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @classmethod
+    def open_existing(cls, run_id: str, journal_dir: str = JOURNAL_DIR) -> "RunJournal":
+        if not os.path.exists(os.path.join(journal_dir, f"{run_id}.jsonl")):
+            raise FileNotFoundError(f"No journal found for run '{run_id}' in {journal_dir}")
+        return cls(run_id, journal_dir)
+
+    @classmethod
+    def create_new(cls, prefix: str, journal_dir: str = JOURNAL_DIR) -> "RunJournal":
+        """Starts the journal of a new run under the first free id of prefix, prefix-2, prefix-3, ..."""
+        os.makedirs(journal_dir, exist_ok=True)
+        for attempt in itertools.count(1):
+            run_id = prefix if attempt == 1 else f"{prefix}-{attempt}"
+            try:
+                # Exclusive create, so runs starting at the same moment never share a journal
+                os.close(os.open(os.path.join(journal_dir, f"{run_id}.jsonl"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+            return cls(run_id, journal_dir)
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be cut short if the previous run was killed mid-write
+                    continue
+                if entry.get("stage") == "meta":
+                    self.metadata.update(entry["data"])
+                else:
+                    self._entries.setdefault((entry["sheet"], entry["stage"]), {})[entry["row"]] = entry["data"]
+
+    def _append(self, entry: Dict):
+        line = json.dumps(entry, default=_to_jsonable)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def write_metadata(self, **metadata):
+        self.metadata.update(metadata)
+        self._append({"stage": "meta", "data": metadata})
+
+    def record(self, sheet: str, stage: str, row: int, data: Dict):
+        with self._lock:
+            self._entries.setdefault((sheet, stage), {})[row] = data
+        self._append({"sheet": sheet, "stage": stage, "row": row, "data": data})
+
+    def completed(self, sheet: str, stage: str) -> Dict[int, Dict]:
+        """Returns the journaled results of a stage for a sheet, keyed by row index."""
+        with self._lock:
+            return dict(self._entries.get((sheet, stage), {}))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def completed_rows(journal: Optional[RunJournal], sheet: str, stage: str) -> Dict[int, Dict]:
+    return journal.completed(sheet, stage) if journal is not None else {}
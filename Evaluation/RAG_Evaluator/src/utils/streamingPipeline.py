@@ -0,0 +1,141 @@
+# src/utils/streamingPipeline.py
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_END = object()
+
+DEFAULT_STREAMING_SETTINGS = {
+    "queue_size": 64,
+    "ragas_batch_size": 16
+}
+
+
+class PipelineStage:
+    """
+    A consumer of the pipeline. handle(rows, items) is called with up to batch_size produced
+    items at a time, from `workers` threads, and returns one result per row.
+    """
+
+    def __init__(self, name: str, handle: Callable[[List[int], List[Any]], List[Any]], workers: int = 1,
+                 batch_size: int = 1, queue_size: int = 64):
+        self.name = name
+        self.handle = handle
+        self.workers = max(workers or 1, 1)
+        self.batch_size = max(batch_size or 1, 1)
+        self.queue = queue.Queue(maxsize=max(queue_size, self.batch_size))
+
+
+class StreamingPipeline:
+    """
+    Bounded producer/consumer pipeline over the rows of a sheet. produce(row) runs on
+    producer_workers threads and each produced item is put on the queue of every stage as soon
+    as it is ready, so the stages work while the remaining rows are still being produced. The
+    queues are bounded: producers wait when a stage falls behind instead of piling up results.
+    The first error raised by a producer or a stage stops the pipeline and is re-raised by run().
+    expand(row, item), if given, turns a produced item into the (row, item) entries the stages get,
+    e.g. one per group of rows that share the item but are evaluated apart.
+    """
+
+    def __init__(self, produce: Callable[[int], Any], stages: List[PipelineStage], producer_workers: int = 1,
+                 expand: Optional[Callable[[int, Any], List[Tuple[int, Any]]]] = None):
+        self.produce = produce
+        self.stages = stages
+        self.expand = expand or (lambda row, item: [(row, item)])
+        self.producer_workers = max(producer_workers or 1, 1)
+        self.first_result_seconds = {}
+        self._failed = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._failed.set()
+
+    def _put(self, stage: PipelineStage, entry) -> bool:
+        # Re-check for failures while blocked, so a dead stage cannot leave producers waiting forever
+        while not self._failed.is_set():
+            try:
+                stage.queue.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, stage: PipelineStage):
+        while not self._failed.is_set():
+            try:
+                return stage.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _producer(self, rows: queue.Queue, produced: Dict[int, Any]):
+        try:
+            while not self._failed.is_set():
+                try:
+                    row = rows.get_nowait()
+                except queue.Empty:
+                    return
+                item = self.produce(row)
+                with self._lock:
+                    produced[row] = item
+                for entry in self.expand(row, item):
+                    for stage in self.stages:
+                        if not self._put(stage, entry):
+                            return
+        except BaseException as e:
+            self._fail(e)
+
+    def _consumer(self, stage: PipelineStage, results: Dict[int, Any], started_at: float):
+        try:
+            finished = False
+            while not finished and not self._failed.is_set():
+                batch = []
+                while len(batch) < stage.batch_size:
+                    entry = self._get(stage)
+                    if entry is _END:
+                        finished = True
+                        break
+                    batch.append(entry)
+                if not batch or self._failed.is_set():
+                    continue
+                rows = [row for row, _ in batch]
+                stage_results = stage.handle(rows, [item for _, item in batch])
+                with self._lock:
+                    results.update(zip(rows, stage_results))
+                    self.first_result_seconds.setdefault(stage.name, round(time.time() - started_at, 3))
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self, rows: Iterable[int]):
+        """Returns (produced, results): the produced items by row and, per stage name, its results by row."""
+        started_at = time.time()
+        pending = queue.Queue()
+        for row in rows:
+            pending.put(row)
+        produced = {}
+        results = {stage.name: {} for stage in self.stages}
+
+        consumers = [threading.Thread(target=self._consumer, args=(stage, results[stage.name], started_at), daemon=True)
+                     for stage in self.stages for _ in range(stage.workers)]
+        producers = [threading.Thread(target=self._producer, args=(pending, produced), daemon=True)
+                     for _ in range(self.producer_workers)]
+        for thread in consumers + producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        # One end marker per worker; each worker stops at the first one it takes
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                self._put(stage, _END)
+        for thread in consumers:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return produced, results
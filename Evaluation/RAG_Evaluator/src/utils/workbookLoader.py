@@ -0,0 +1,200 @@
+# src/utils/workbookLoader.py
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.dataProcessing import parse_contexts
+
+WORKBOOK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "outputs", "cache", "workbooks")
+
+# Columns holding lists of strings; they are parsed once on load and stored as Parquet list<string>
+LIST_COLUMNS = ("contexts",)
+# Size limits of the parsed workbooks kept in memory and of the Parquet copies under WORKBOOK_CACHE_DIR.
+# The least recently used workbooks are dropped first; the one just read is always kept.
+MAX_WORKBOOK_MEMORY_BYTES = 256 * 1024 * 1024
+MAX_WORKBOOK_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+# Parsed workbooks kept in memory as (sheets, size in bytes), least recently used first
+_workbooks = OrderedDict()
+_file_hashes = {}
+_lock = threading.Lock()
+
+
+def file_hash(path: str) -> str:
+    """sha256 of the file content, remembered per (path, size, mtime) so unchanged files are hashed once."""
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        if stamp in _file_hashes:
+            return _file_hashes[stamp]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _lock:
+        _file_hashes[stamp] = digest.hexdigest()
+    return _file_hashes[stamp]
+
+
+def _header(values) -> List[str]:
+    # Same column names as pd.read_excel: "Unnamed: i" for blanks and ".n" suffixes for duplicates
+    names, seen = [], {}
+    for index, value in enumerate(values):
+        name = f"Unnamed: {index}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _sheet_frame(rows) -> pd.DataFrame:
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    columns = _header(header)
+    data = [list(row[:len(columns)]) + [None] * (len(columns) - len(row)) for row in rows]
+    # Like pd.read_excel, blank rows inside the sheet are kept and trailing ones dropped
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    df = pd.DataFrame(data, columns=columns)
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        if values.empty:
+            df[column] = df[column].astype(float)
+        elif not values.map(lambda value: isinstance(value, str)).all():
+            # Parquet needs one type per column; mixed text/number cells are kept as text
+            df[column] = df[column].map(lambda value: value if value is None else str(value))
+    return df
+
+
+def _with_list_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_contexts(df[column])
+    return df
+
+
+def _read_xlsx(path: str) -> "OrderedDict[str, pd.DataFrame]":
+    """Reads every sheet in a single read-only pass over the workbook."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return OrderedDict((sheet.title, _with_list_columns(_sheet_frame(sheet.iter_rows(values_only=True))))
+                           for sheet in workbook.worksheets)
+    finally:
+        workbook.close()
+
+
+def _load_parquet_cache(cache_dir: str) -> Optional["OrderedDict[str, pd.DataFrame]"]:
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            sheet_names = json.load(f)["sheets"]
+        sheets = OrderedDict((name, _with_list_columns(pd.read_parquet(os.path.join(cache_dir, f"{index}.parquet"))))
+                             for index, name in enumerate(sheet_names))
+    except (OSError, ValueError, KeyError):
+        # Evicted by another process while it was being read; the workbook is parsed again
+        return None
+    # The manifest's mtime marks when the entry was last used, for _prune_parquet_cache
+    os.utime(manifest_path)
+    return sheets
+
+
+def _write_parquet_cache(cache_dir: str, sheets: Dict[str, pd.DataFrame]):
+    os.makedirs(cache_dir, exist_ok=True)
+    for index, df in enumerate(sheets.values()):
+        df.to_parquet(os.path.join(cache_dir, f"{index}.parquet"), index=False)
+    # The manifest goes last, so a half-written cache is never picked up
+    with open(os.path.join(cache_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"sheets": list(sheets)}, f, ensure_ascii=False)
+
+
+def _directory_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def _prune_parquet_cache(cache_dir: str, keep: str, max_bytes: int):
+    """Deletes the least recently used workbook entries under cache_dir until they fit in max_bytes."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        manifest_path = os.path.join(entry.path, "manifest.json")
+        if entry.is_dir() and entry.name != keep and os.path.exists(manifest_path):
+            entries.append((os.stat(manifest_path).st_mtime, entry.path))
+    total = _directory_size(os.path.join(cache_dir, keep)) + sum(_directory_size(path) for _, path in entries)
+    for _, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        total -= _directory_size(path)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _workbook_size(sheets: Dict[str, pd.DataFrame]) -> int:
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in sheets.values()))
+
+
+def clear_workbooks():
+    """Drops the parsed workbooks held in memory, e.g. once a job that read them is done."""
+    with _lock:
+        _workbooks.clear()
+        _file_hashes.clear()
+
+
+def read_workbook(path: str, cache_dir: str = WORKBOOK_CACHE_DIR) -> "OrderedDict[str, pd.DataFrame]":
+    """
+    Returns every sheet of the workbook, in workbook order. The xlsx file is parsed once and stored
+    as Parquet under cache_dir, keyed by the hash of its content; later reads, in this process or
+    the next run, come from memory or the Parquet files. A .parquet input is read as a single sheet
+    named after the file, so its contexts can be stored as a native list<string> column. Both caches
+    are bounded by MAX_WORKBOOK_MEMORY_BYTES and MAX_WORKBOOK_CACHE_BYTES.
+    """
+    digest = file_hash(path)
+    with _lock:
+        if digest in _workbooks:
+            _workbooks.move_to_end(digest)
+            return _workbooks[digest][0]
+    sheet_cache_dir = os.path.join(cache_dir, digest)
+    if path.lower().endswith(".parquet"):
+        sheets = OrderedDict([(os.path.splitext(os.path.basename(path))[0], _with_list_columns(pd.read_parquet(path)))])
+    else:
+        sheets = _load_parquet_cache(sheet_cache_dir)
+    if sheets is None:
+        sheets = _read_xlsx(path)
+        try:
+            _write_parquet_cache(sheet_cache_dir, sheets)
+            _prune_parquet_cache(cache_dir, digest, MAX_WORKBOOK_CACHE_BYTES)
+        except Exception as e:
+            print(f"Could not cache workbook '{path}' as Parquet: {e}")
+    size = _workbook_size(sheets)
+    with _lock:
+        sheets = _workbooks.setdefault(digest, (sheets, size))[0]
+        _workbooks.move_to_end(digest)
+        while len(_workbooks) > 1 and sum(size for _, size in _workbooks.values()) > MAX_WORKBOOK_MEMORY_BYTES:
+            _workbooks.popitem(last=False)
+        return sheets
+
+
+def workbook_sheet_names(path: str) -> List[str]:
+    return list(read_workbook(path))
+
+
+def read_sheet(path: str, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Returns a copy of one sheet; the first sheet when sheet_name is empty, like pd.read_excel."""
+    sheets = read_workbook(path)
+    if not sheet_name:
+        sheet_name = next(iter(sheets))
+    if sheet_name not in sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return sheets[sheet_name].copy()